@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable
+
+from .metrics import metrics
+
+
+class TTLCache:
+    """
+    Thread-safe, per-process LRU cache whose entries expire `ttl` seconds
+    after they were written.
+
+    Hits, misses and size are exported as `cache.<name>.*` metrics.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        metrics.register_gauge(f"cache.{name}.size", self.__len__)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > monotonic():
+                    self._data.move_to_end(key)
+                    metrics.inc(f"cache.{self.name}.hits")
+                    return value
+                del self._data[key]
+
+        metrics.inc(f"cache.{self.name}.misses")
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,9 +1,15 @@
 import os
+from time import perf_counter
+from typing import Callable
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 from urllib.parse import quote_plus
 
+from .metrics import metrics
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
@@ -12,13 +18,46 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
+# Pool sizing is per engine and per process:
+# connections used <= uvicorn workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))      # seconds, -1 disables
+# pre-ping costs a round trip per checkout; with a recycle shorter than the
+# server/proxy idle timeout it can usually be turned off
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 = no timeout
+# schema is managed by Alembic (`alembic upgrade head`); create_all on startup
+# is only a convenience for throwaway local databases
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() == "true"
+
 safe_password = quote_plus(DB_PASSWORD)
 
 DATABASE_URL = (
     f"postgresql://{DB_USER}:{safe_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# same database, asyncpg driver (used by async def routes)
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{safe_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+
+sync_connect_args = {}
+async_connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    sync_connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+engine = create_engine(DATABASE_URL, connect_args=sync_connect_args, **POOL_OPTIONS)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -26,6 +65,58 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args, **POOL_OPTIONS)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# -------------------- POOL METRICS --------------------
+
+for _name, _pool in (("db.pool", engine.pool), ("db.async_pool", async_engine.pool)):
+    metrics.register_gauge(f"{_name}.in_use", _pool.checkedout)
+    metrics.register_gauge(f"{_name}.idle", _pool.checkedin)
+    metrics.register_gauge(f"{_name}.overflow", _pool.overflow)
+
+
+def pool_saturated(pool) -> bool:
+    """True when the next checkout has to wait for a connection to be returned."""
+    return pool.checkedin() == 0 and pool.overflow() >= DB_MAX_OVERFLOW
+
+
+def record_checkout(name: str, waited: bool, started: float, timed_out: bool = False):
+    metrics.observe(f"{name}.checkout", perf_counter() - started)
+    if waited:
+        metrics.inc(f"{name}.waits")
+    if timed_out:
+        metrics.inc(f"{name}.timeouts")
+
+
+# -------------------- AFTER COMMIT --------------------
+
+def after_commit(db: Session, callback: Callable[[], None]):
+    """
+    Runs `callback` once `db` commits (dropped if it rolls back), e.g. to
+    invalidate a cache only when readers can see the new rows.
+    """
+    db.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(db: Session):
+    for callback in db.info.pop("after_commit", ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(db: Session):
+    db.info.pop("after_commit", None)
+
+
 # ✅ BASE CLASS (VERY IMPORTANT)
 class Base(DeclarativeBase):
     pass
@@ -34,6 +125,43 @@ class Base(DeclarativeBase):
 def get_db():
     db = SessionLocal()
     try:
+        # check the connection out up front so pool wait time is measured
+        waited = pool_saturated(engine.pool)
+        started = perf_counter()
+        try:
+            db.connection()
+        except PoolTimeoutError:
+            record_checkout("db.pool", waited, started, timed_out=True)
+            raise
+        record_checkout("db.pool", waited, started)
+
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db for `async def` routes.
+    Does not hold a threadpool worker while waiting on Postgres.
+    """
+    async with AsyncSessionLocal() as db:
+        waited = pool_saturated(async_engine.pool)
+        started = perf_counter()
+        try:
+            await db.connection()
+        except PoolTimeoutError:
+            record_checkout("db.async_pool", waited, started, timed_out=True)
+            raise
+        record_checkout("db.async_pool", waited, started)
+
+        yield db
+
+
+async def get_async_db_lazy():
+    """
+    get_async_db without the up-front checkout: a connection is only taken
+    from the pool if the route actually queries (e.g. on a cache miss).
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,58 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry.
+
+    - counters: monotonically increasing values
+    - timings:  count / total / max of observed durations (seconds)
+    - gauges:   callables read at snapshot time (e.g. pool in-use connections)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._timings: dict[str, list[float]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timing = self._timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - started)
+
+    def register_gauge(self, name: str, read: Callable[[], float]):
+        self._gauges[name] = read
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            for name, (count, total, longest) in self._timings.items():
+                data[f"{name}.count"] = count
+                data[f"{name}.avg_ms"] = (total / count * 1000) if count else 0.0
+                data[f"{name}.max_ms"] = longest * 1000
+
+        for name, read in self._gauges.items():
+            data[name] = read()
+        return data
+
+
+metrics = Metrics()
@@ -1,7 +1,7 @@
 # Import ALL models here so SQLAlchemy can register them
+# (used by main.py and by the Alembic env in migrations/env.py)
 
-from ..modules.users.models import User
-from ..modules.users.models import User
+from ..modules.users.models import User, RefreshToken, PasswordResetToken
 
 from ..modules.events.models import (
     Event,
@@ -12,5 +12,6 @@ from ..modules.events.models import (
     CheckIn
 )
 
-from ..modules.tickets.models import Ticket
-from ..modules.payments.models import Payment
+from ..modules.tickets.models import Ticket, TicketIssuanceJob
+from ..modules.payments.models import Payment, PaymentWebhookEvent, EventPaymentTotal
+from ..modules.scanners.models import CheckInCount
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import threading
+from typing import Awaitable, Callable, Protocol
+
+from fastapi import Request, Response, status
+
+from .cache import TTLCache
+from .metrics import metrics
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 5000))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 60))
+# "local" (per process) or "redis" (shared by all workers)
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "local")
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+class ResponseCacheBackend(Protocol):
+    """
+    Storage for cached bodies plus one version counter per tag.
+    Invalidation bumps the version; entries stored under the old version
+    are never read again and age out on their own.
+
+    Reads are async (they run in async routes); bump() is sync because
+    writers are sync services running in the threadpool.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: int): ...
+
+    async def versions(self, tags: list[str]) -> list[int]: ...
+
+    def bump(self, tag: str): ...
+
+
+class LocalBackend:
+    """
+    In-process LRU. Invalidation only reaches this worker; other workers
+    serve their copy until it expires (RESPONSE_CACHE_TTL_SECONDS).
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries = TTLCache("responses", maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries.set(key, value)
+
+    async def versions(self, tags: list[str]) -> list[int]:
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tag: str):
+        with self._lock:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class RedisBackend:
+    """
+    Shared by every worker, so an invalidation is seen everywhere at once.
+    Reads go through redis.asyncio so a cache lookup never blocks the event
+    loop; bumps use a blocking client from the writer's thread.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        import redis.asyncio
+
+        self._client = redis.asyncio.Redis.from_url(url)
+        self._sync_client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(f"response:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(f"response:{key}", value, ex=ttl)
+
+    async def versions(self, tags: list[str]) -> list[int]:
+        # one round trip however many tags
+        values = await self._client.mget([f"response-version:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tag: str):
+        self._sync_client.incr(f"response-version:{tag}")
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized JSON responses with ETags.
+
+    Entries are keyed by the request key plus the current version of each
+    tag they depend on (e.g. "events" for list pages, "event:<id>" for one
+    event). Writers call invalidate() with the tags they touched.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, ttl: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._hits = 0
+        self._misses = 0
+        metrics.register_gauge("response_cache.hit_ratio", self.hit_ratio)
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    async def _versioned_key(self, key: str, tags: list[str]) -> str:
+        versions = await self.backend.versions(tags)
+        return f"{key}|" + ",".join(f"{tag}@{version}" for tag, version in zip(tags, versions))
+
+    def hit_ratio(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        tags: list[str],
+        produce: Callable[[], Awaitable[bytes]]
+    ) -> Response:
+        """
+        JSON response for `key`, from the cache or from `produce()`.
+        Answers 304 when If-None-Match matches the cached ETag.
+        """
+        if not self.enabled:
+            body = await produce()
+            return self._response(request, body, self.etag_for(body))
+
+        # versions are read before the DB so a write that commits meanwhile
+        # stores nothing under the new version
+        versioned_key = await self._versioned_key(key, tags)
+        entry = await self.backend.get(versioned_key)
+        if entry is not None:
+            # stored as b'<etag>\n<body>' so hits do not re-hash the body
+            etag, body = entry.split(b"\n", 1)
+            etag = etag.decode()
+            self._hits += 1
+            metrics.inc("response_cache.hits")
+            metrics.inc("response_cache.bytes_saved", len(body))
+        else:
+            self._misses += 1
+            metrics.inc("response_cache.misses")
+            body = await produce()
+            etag = self.etag_for(body)
+            await self.backend.set(versioned_key, etag.encode() + b"\n" + body, self.ttl)
+
+        return self._response(request, body, etag)
+
+    @staticmethod
+    def _response(request: Request, body: bytes, etag: str) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            metrics.inc("response_cache.not_modified")
+            metrics.inc("response_cache.bytes_not_sent", len(body))
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tags: str):
+        if not self.enabled:
+            return
+        for tag in tags:
+            self.backend.bump(tag)
+        metrics.inc("response_cache.invalidations", len(tags))
+
+
+def _make_backend() -> ResponseCacheBackend:
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(RESPONSE_CACHE_REDIS_URL)
+    return LocalBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = ResponseCache(
+    backend=_make_backend(),
+    ttl=RESPONSE_CACHE_TTL_SECONDS,
+    enabled=RESPONSE_CACHE_ENABLED
+)
@@ -1,11 +1,17 @@
+import asyncio
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
+from fastapi import HTTPException, status
 from jose import jwt
-from passlib.context import CryptContext
 from dotenv import load_dotenv
 
+from .metrics import metrics
+
 load_dotenv()
 
 # --- Config and Constants ---
@@ -14,13 +20,111 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
 # --- Password Hashing (Moved from utils.py) ---
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 cost is configurable; hashes made with other parameters are
+# upgraded on the next successful login (see verify_and_update).
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+
+@lru_cache(maxsize=1)
+def pwd_context():
+    # hashing only happens in the pool workers, so passlib/argon2 are
+    # imported there and not by the web process
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=ARGON2_TIME_COST,
+        argon2__memory_cost=ARGON2_MEMORY_COST,
+        argon2__parallelism=ARGON2_PARALLELISM
+    )
+
+def _hash(password: str) -> str:
+    return pwd_context().hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+# --- Hashing Pool ---
+# Argon2 is memory-hard; running it on request threads lets a login storm
+# starve every other endpoint. Hashing runs in a small process pool instead,
+# and callers beyond workers + queue get a 429 straight away.
+# Async callers (/auth/login) await the result without holding a thread.
+# Sync callers (register, password change) still block their threadpool
+# thread until the hash is done; the admission cap bounds how many.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 16))
+
+
+class PasswordHasher:
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _admit(self):
+        if not self._slots.acquire(blocking=False):
+            metrics.inc("auth.hashing.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent authentication requests, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+    def run(self, fn, *args):
+        """Blocks the calling thread until the pool is done."""
+        self._admit()
+        try:
+            with metrics.timer("auth.hashing"):
+                return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    async def run_async(self, fn, *args):
+        """Awaits the pool from async code; no thread waits meanwhile."""
+        self._admit()
+        try:
+            with metrics.timer("auth.hashing"):
+                return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE)
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.run(_hash, password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update(plain_password, hashed_password)[0]
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Returns (valid, new_hash). new_hash is set when the stored hash was made
+    with outdated Argon2 parameters and should replace it.
+    """
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """verify_and_update for async routes."""
+    return await password_hasher.run_async(_verify_and_update, plain_password, hashed_password)
 
 # --- JWT Functions ---
 
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class JSONBytesResponse(Response):
+    """
+    Response for a body that is already JSON (e.g. from dump_json), so it
+    is not encoded a second time.
+    """
+    media_type = "application/json"
+
+
+def dump_json(adapter: TypeAdapter, rows: Any) -> bytes:
+    """
+    Serialize ORM objects or column rows through a precompiled TypeAdapter.
+
+    Validation and JSON encoding both run in pydantic-core, instead of
+    FastAPI's jsonable_encoder walking every attribute in Python.
+    """
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
@@ -0,0 +1,357 @@
+# activity.py
+# Per-event feed of registration and check-in changes for organiser
+# dashboards, served as server-sent events.
+#
+# Services publish a small delta on the session that writes the change.
+# With ACTIVITY_FANOUT=postgres (default) the deltas of a commit are sent
+# inside the committing transaction, one pg_notify per event in a single
+# statement, so they go out only if the change commits. Every worker that
+# has dashboards open LISTENs and passes them on to its subscribers; it
+# does not matter which worker (or background task) made the change.
+# Deltas published outside a transaction (db=None) are batched by a
+# notifier thread instead of opening a transaction in the request.
+# ACTIVITY_FANOUT=local skips Postgres and only reaches dashboards on the
+# same process (single-worker deployments).
+#
+# Nothing is queued or sent while no dashboard is open on any worker:
+# listener connections carry ACTIVITY_LISTENER_NAME as application_name
+# and publishers look for one in pg_stat_activity at most every
+# ACTIVITY_LISTENER_CHECK_SECONDS. A listener stays connected only while
+# its process has subscribers; after (re)connecting it sends its
+# dashboards one `resync` once publishers have had time to notice it.
+#
+# Each subscriber has a bounded buffer: a dashboard that falls behind gets
+# a `resync` event (reload the list once) instead of holding memory or
+# slowing publishers.
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import select as selectors
+import threading
+import time
+from collections import defaultdict
+from typing import AsyncIterator
+from uuid import UUID
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import event as orm_event, text
+from sqlalchemy.orm import Session
+
+from ...core.database import engine
+from ...core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FANOUT = os.getenv("ACTIVITY_FANOUT", "postgres")  # "postgres" or "local"
+ACTIVITY_CHANNEL = "event_activity"
+ACTIVITY_BUFFER_SIZE = int(os.getenv("ACTIVITY_BUFFER_SIZE", 256))
+ACTIVITY_HEARTBEAT_SECONDS = int(os.getenv("ACTIVITY_HEARTBEAT_SECONDS", 15))
+ACTIVITY_LISTENER_NAME = "event-activity-listener"
+ACTIVITY_LISTENER_CHECK_SECONDS = int(os.getenv("ACTIVITY_LISTENER_CHECK_SECONDS", 5))
+# how long the notifier collects db=None deltas before sending them
+ACTIVITY_NOTIFY_INTERVAL_MS = int(os.getenv("ACTIVITY_NOTIFY_INTERVAL_MS", 50))
+# NOTIFY payloads are limited to 8000 bytes; an event's deltas beyond that become a resync
+ACTIVITY_MAX_PAYLOAD = 7900
+
+NOTIFY = text(
+    "SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"
+)
+# same role as the app, so application_name of its other sessions is visible
+LISTENERS = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_stat_activity "
+    "WHERE application_name = :name AND datname = current_database())"
+)
+
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+class ActivitySubscriber:
+    """
+    One stream's bounded buffer. Messages are queued on the subscriber's
+    own event loop, whatever thread published them.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+
+    def offer(self, message: str):
+        # runs on self.loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # too far behind for deltas to be useful: drop them, ask for a reload
+            metrics.inc("events.activity.dropped", self.queue.qsize() + 1)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class ActivityHub:
+    """
+    Fan-out by event ID: publish() on the writing session, stream() per
+    dashboard. See the module comment for how deltas cross processes.
+    """
+
+    def __init__(self, fanout: str = ACTIVITY_FANOUT, buffer_size: int = ACTIVITY_BUFFER_SIZE):
+        self.fanout = fanout
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[UUID, set[ActivitySubscriber]] = {}
+        self._listener: threading.Thread | None = None
+        self._listeners_seen = False
+        self._listeners_checked_at = float("-inf")
+        self._outbox: queue.Queue[tuple[UUID, str]] = queue.Queue()
+        self._notifier: threading.Thread | None = None
+        metrics.register_gauge("events.activity.subscribers", self.subscriber_count)
+        metrics.register_gauge("events.activity.outbox", self._outbox.qsize)
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in list(self._subscribers.values()))
+
+    # ---- publishing ----
+
+    def publish(self, db: Session | None, event_id: UUID, kind: str, data, schema: type[BaseModel] | None = None):
+        """
+        Queues one delta on `db`; it is sent when that session commits and
+        dropped if it rolls back. `data` is a dict, or an object read through
+        `schema` at commit time (after the flush, so generated IDs and
+        defaults are set). With db=None the delta is sent straight away
+        (by the notifier thread in postgres mode).
+        """
+        if not self._watched(event_id, db):
+            return
+        if db is None:
+            self._send_now(event_id, self._message(kind, data, schema))
+            return
+        db.info.setdefault("activity", []).append((event_id, kind, data, schema))
+
+    def _watched(self, event_id: UUID, db: Session | None) -> bool:
+        """False when no dashboard can be listening for the event's deltas."""
+        if self._subscribers.get(event_id):
+            return True
+        if self.fanout == "local":
+            return False
+        if db is None and self._listeners_stale():
+            return True  # the notifier checks before sending
+        return self._any_listener(db)
+
+    def _listeners_stale(self) -> bool:
+        return time.monotonic() - self._listeners_checked_at >= ACTIVITY_LISTENER_CHECK_SECONDS
+
+    def _any_listener(self, conn) -> bool:
+        """Whether any worker has a listener connected; cached for a few seconds."""
+        if self._listeners_stale():
+            self._listeners_seen = bool(
+                conn.execute(LISTENERS, {"name": ACTIVITY_LISTENER_NAME}).scalar_one()
+            )
+            self._listeners_checked_at = time.monotonic()
+        return self._listeners_seen
+
+    @staticmethod
+    def _message(kind: str, data, schema: type[BaseModel] | None) -> str:
+        if schema is not None:
+            data = schema.model_validate(data, from_attributes=True)
+        body = data.model_dump_json() if isinstance(data, BaseModel) else to_json(data).decode()
+        return f"event: {kind}\ndata: {body}\n\n"
+
+    @staticmethod
+    def _payloads(messages: list[tuple[UUID, str]]) -> list[str]:
+        """One NOTIFY payload per event; a resync if its deltas do not fit."""
+        by_event: dict[UUID, list[str]] = defaultdict(list)
+        for event_id, message in messages:
+            by_event[event_id].append(message)
+        payloads = []
+        for event_id, event_messages in by_event.items():
+            payload = json.dumps({"event_id": str(event_id), "messages": event_messages})
+            if len(payload.encode()) > ACTIVITY_MAX_PAYLOAD:
+                payload = json.dumps({"event_id": str(event_id), "messages": [RESYNC]})
+            payloads.append(payload)
+        return payloads
+
+    def _notify(self, conn, messages: list[tuple[UUID, str]]):
+        conn.execute(NOTIFY, {"channel": ACTIVITY_CHANNEL, "payloads": self._payloads(messages)})
+        metrics.inc("events.activity.published", len(messages))
+
+    def _send_now(self, event_id: UUID, message: str):
+        if self.fanout == "local":
+            metrics.inc("events.activity.published")
+            self._deliver(event_id, message)
+            return
+        self._ensure_notifying()
+        self._outbox.put((event_id, message))
+
+    def _before_commit(self, db: Session):
+        queued = db.info.pop("activity", None)
+        if not queued:
+            return
+        db.flush()
+        messages = [(event_id, self._message(kind, data, schema)) for event_id, kind, data, schema in queued]
+        if self.fanout == "local":
+            # delivered once the commit went through
+            db.info["activity_messages"] = messages
+        else:
+            self._notify(db, messages)
+
+    def _after_commit(self, db: Session):
+        for event_id, message in db.info.pop("activity_messages", ()):
+            metrics.inc("events.activity.published")
+            self._deliver(event_id, message)
+
+    @staticmethod
+    def _after_rollback(db: Session):
+        db.info.pop("activity", None)
+        db.info.pop("activity_messages", None)
+
+    def _next_batch(self) -> list[tuple[UUID, str]]:
+        batch = [self._outbox.get()]
+        deadline = time.monotonic() + ACTIVITY_NOTIFY_INTERVAL_MS / 1000
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self._outbox.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_notifier(self):
+        """Sends db=None deltas, one transaction and one statement per batch."""
+        while True:
+            batch = self._next_batch()
+            try:
+                with engine.begin() as conn:
+                    if self._any_listener(conn):
+                        self._notify(conn, batch)
+            except Exception:
+                # best effort, like a dashboard that fell behind
+                metrics.inc("events.activity.notify_failures")
+                logger.exception("Could not send %d activity deltas", len(batch))
+
+    def _ensure_notifying(self):
+        if self._notifier and self._notifier.is_alive():
+            return
+        with self._lock:
+            if not (self._notifier and self._notifier.is_alive()):
+                self._notifier = threading.Thread(target=self._run_notifier, name="activity-notifier", daemon=True)
+                self._notifier.start()
+
+    # ---- delivery ----
+
+    def _deliver(self, event_id: UUID, message: str):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+            except RuntimeError:
+                # loop already closed; its stream is going away
+                pass
+
+    def _deliver_all(self, message: str):
+        for event_id in list(self._subscribers):
+            self._deliver(event_id, message)
+
+    def _stop_if_idle(self) -> bool:
+        with self._lock:
+            if self._subscribers:
+                return False
+            self._listener = None
+            return True
+
+    def _listen(self):
+        """
+        LISTEN on a dedicated connection (outside the pool) and deliver
+        notifications to this process's subscribers while it has any.
+        Reconnects on error.
+        """
+        while True:
+            conn = None
+            try:
+                pooled = engine.raw_connection()
+                pooled.detach()
+                conn = pooled.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute("SET application_name = %s", (ACTIVITY_LISTENER_NAME,))
+                    cursor.execute(f"LISTEN {ACTIVITY_CHANNEL}")
+                # deltas sent before publishers noticed this listener were missed
+                resync_at = time.monotonic() + ACTIVITY_LISTENER_CHECK_SECONDS
+                while True:
+                    timeout = ACTIVITY_HEARTBEAT_SECONDS
+                    if resync_at is not None:
+                        timeout = max(0.0, min(timeout, resync_at - time.monotonic()))
+                    if selectors.select([conn], [], [], timeout) == ([], [], []):
+                        if resync_at is not None and time.monotonic() >= resync_at:
+                            resync_at = None
+                            self._deliver_all(RESYNC)
+                        elif resync_at is None and self._stop_if_idle():
+                            return
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = json.loads(conn.notifies.pop(0).payload)
+                        event_id = UUID(notification["event_id"])
+                        for message in notification["messages"]:
+                            self._deliver(event_id, message)
+            except Exception:
+                metrics.inc("events.activity.listener_failures")
+                logger.exception("Activity listener failed; reconnecting")
+                time.sleep(1)
+                if self._stop_if_idle():
+                    return
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _ensure_listening(self):
+        # called with self._lock held
+        if self.fanout == "local" or (self._listener and self._listener.is_alive()):
+            return
+        self._listener = threading.Thread(target=self._listen, name="activity-listener", daemon=True)
+        self._listener.start()
+
+    # ---- subscribing ----
+
+    def subscribe(self, event_id: UUID) -> ActivitySubscriber:
+        subscriber = ActivitySubscriber(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(event_id, set()).add(subscriber)
+            self._ensure_listening()
+        return subscriber
+
+    def unsubscribe(self, event_id: UUID, subscriber: ActivitySubscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(event_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[event_id]
+
+    async def stream(self, event_id: UUID) -> AsyncIterator[str]:
+        """
+        Server-sent events for one dashboard until the client disconnects.
+        Starts with a `ready` event; a comment line is sent as keep-alive.
+        """
+        subscriber = self.subscribe(event_id)
+        try:
+            yield f"event: ready\ndata: {to_json({'event_id': event_id}).decode()}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), ACTIVITY_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(event_id, subscriber)
+
+
+activity_hub = ActivityHub()
+
+orm_event.listen(Session, "before_commit", activity_hub._before_commit)
+orm_event.listen(Session, "after_commit", activity_hub._after_commit)
+orm_event.listen(Session, "after_rollback", activity_hub._after_rollback)
@@ -0,0 +1,83 @@
+# holds.py
+# Releases seats held by unpaid registrations.
+#
+# Events with hold_minutes give every new (pending) registration a
+# hold_expires_at. Registrations still pending after that are cancelled and
+# their seats go back to the event, in the same transaction. Started from
+# the app lifespan.
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from time import perf_counter
+
+from ...core.database import SessionLocal
+from ...core.metrics import metrics
+from ..scanners.index import scan_indexes
+from .activity import activity_hub
+from .models import RegistrationStatus
+from .repository import EventRepository, EventRegistrationRepository
+from .services import EventService
+
+logger = logging.getLogger(__name__)
+
+HOLD_EXPIRY_INTERVAL_SECONDS = int(os.getenv("HOLD_EXPIRY_INTERVAL_SECONDS", 30))
+HOLD_EXPIRY_BATCH_SIZE = int(os.getenv("HOLD_EXPIRY_BATCH_SIZE", 1000))
+HOLD_EXPIRY_MAX_BATCHES = int(os.getenv("HOLD_EXPIRY_MAX_BATCHES", 50))
+
+
+def expire_holds(
+    batch_size: int = HOLD_EXPIRY_BATCH_SIZE,
+    max_batches: int = HOLD_EXPIRY_MAX_BATCHES
+) -> int:
+    """
+    One pass in bounded batches (one short transaction per batch).
+    Returns the number of registrations cancelled.
+    """
+    started = perf_counter()
+    expired_total = 0
+    with SessionLocal() as db:
+        for _ in range(max_batches):
+            expired = EventRegistrationRepository.expire_holds(db, batch_size)
+            released = Counter(row.event_id for row in expired)
+            EventRepository.release_seats(db, released)
+            for row in expired:
+                activity_hub.publish(db, row.event_id, "registration_status", {
+                    "registration_id": row.registration_id,
+                    "status": RegistrationStatus.cancelled
+                })
+            db.commit()
+
+            for event_id in released:
+                EventService.seats_released(event_id)
+            # cancelled codes must stop scanning
+            for row in expired:
+                scan_indexes.remove_registrations(row.event_id, [row.registration_id])
+
+            batch = sum(released.values())
+            expired_total += batch
+            if batch < batch_size:
+                break
+
+    elapsed = perf_counter() - started
+    metrics.inc("events.holds_expired", expired_total)
+    metrics.observe("events.hold_expiry.run", elapsed)
+    if expired_total:
+        logger.info("Expired %d registration holds in %.2fs", expired_total, elapsed)
+    return expired_total
+
+
+async def run_hold_expirer(interval: int = HOLD_EXPIRY_INTERVAL_SECONDS):
+    """
+    Runs expire_holds every `interval` seconds in a worker thread until cancelled.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(expire_holds)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.inc("events.hold_expiry.failures")
+            logger.exception("Registration hold expiry failed")
+        await asyncio.sleep(interval)
@@ -1,5 +1,5 @@
 #Event models.py
-from sqlalchemy import String, DateTime, func, Boolean, ForeignKey, Text, Enum
+from sqlalchemy import String, DateTime, func, Boolean, ForeignKey, Text, Enum, Index, Integer, CheckConstraint, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -16,6 +16,17 @@ class Event(Base):
     SQLAlchemy model for 'events' table in PostgreSQL database
     """
     __tablename__ = "events"
+    __table_args__ = (
+        # keyset pagination for GET /events/ (ORDER BY start_date, event_id)
+        Index("ix_events_start_date_event_id", "start_date", "event_id"),
+        Index("ix_events_category_start_date", "category_id", "start_date", "event_id"),
+        Index("ix_events_venue_start_date", "venue", "start_date", "event_id"),
+        # backstop for the conditional UPDATE in EventRepository.reserve_seat
+        CheckConstraint(
+            "capacity IS NULL OR seats_taken <= capacity",
+            name="ck_events_seats_within_capacity"
+        ),
+    )
 
     event_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -68,6 +79,26 @@ class Event(Base):
         nullable=True
     )
 
+    # NULL = unlimited
+    capacity: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True
+    )
+
+    # pending + confirmed registrations; only changed by single UPDATEs
+    seats_taken: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
+    # minutes an unpaid (pending) registration holds its seat; NULL = forever
+    hold_minutes: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True
+    )
+
     created_by: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey(User.user_id),
@@ -135,6 +166,10 @@ class OrganiserRole(enum.Enum):
 
 class EventOrganiser(Base):
     __tablename__ = "event_organisers"
+    __table_args__ = (
+        # one role per user per event; also serves the RBAC lookup
+        Index("ux_event_organisers_event_user", "event_id", "user_id", unique=True),
+    )
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
 
@@ -218,6 +253,14 @@ class RegistrationStatus(enum.Enum):
 
 class EventRegistration(Base):
     __tablename__ = "event_registrations"
+    __table_args__ = (
+        # hold expiry scan: only pending registrations with a hold
+        Index(
+            "ix_event_registrations_pending_holds",
+            "hold_expires_at",
+            postgresql_where=text("status = 'pending' AND hold_expires_at IS NOT NULL")
+        ),
+    )
 
     registration_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -254,6 +297,7 @@ class EventRegistration(Base):
 
     qr_code: Mapped[str] = mapped_column(
         String(255),
+        index=True,
         nullable=False
     )
 
@@ -269,6 +313,12 @@ class EventRegistration(Base):
         nullable=False
     )
 
+    # seat is released if still pending at this time (see events/holds.py)
+    hold_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
     # relationships
     event = relationship("Event", back_populates="registrations")
     user = relationship("User", back_populates="event_registrations")
@@ -295,6 +345,7 @@ class CheckIn(Base):
     registration_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("event_registrations.registration_id", ondelete="CASCADE"),
+        unique=True,  # one check-in per registration, whichever worker scanned it
         nullable=False
     )
 
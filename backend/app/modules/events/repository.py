@@ -1,14 +1,19 @@
 # repository.py
 # it contails ONLY database operations
 # NO FastAPI, NO schemas, NO business rules
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, update, or_, func, bindparam, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from datetime import datetime
 
 from .models import (
     Event,
     EventOrganiser,
     EventSession,
     EventRegistration,
+    RegistrationStatus,
     CheckIn
 )
 
@@ -20,6 +25,40 @@ class EventRepository:
     @staticmethod
     def get_all(db: Session):
         return db.query(Event).all()
+
+    @staticmethod
+    def page_query(
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+        category_id: UUID | None = None,
+        venue: str | None = None,
+        starts_from: datetime | None = None,
+        starts_to: datetime | None = None
+    ):
+        """
+        Keyset page ordered by (start_date, event_id).
+        `after` is the (start_date, event_id) of the last row already seen.
+        Selects plain column rows (no ORM identity map), enough for EventRead.
+        """
+        stmt = select(Event.__table__)
+
+        if category_id:
+            stmt = stmt.where(Event.category_id == category_id)
+        if venue:
+            stmt = stmt.where(Event.venue == venue)
+        if starts_from:
+            stmt = stmt.where(Event.start_date >= starts_from)
+        if starts_to:
+            stmt = stmt.where(Event.start_date < starts_to)
+        if after:
+            stmt = stmt.where(tuple_(Event.start_date, Event.event_id) > after)
+
+        return stmt.order_by(Event.start_date, Event.event_id).limit(limit)
+
+    @staticmethod
+    def get_page(db: Session, limit: int, **filters) -> list[Row]:
+        stmt = EventRepository.page_query(limit, **filters)
+        return list(db.execute(stmt).all())
     
     @staticmethod
     def get_by_id(db: Session, event_id: UUID) -> Event | None:
@@ -37,6 +76,84 @@ class EventRepository:
         db.delete(event)
         db.commit()
 
+    @staticmethod
+    def reserve_seat(db: Session, event_id: UUID) -> Row | None:
+        """
+        Takes one seat with a single conditional UPDATE (no COUNT, no
+        SELECT ... FOR UPDATE). Returns (hold_minutes,) or None when the event
+        is full or does not exist. Not committed: the caller commits it
+        together with the registration. updated_at is left alone (it would
+        otherwise get onupdate=now()): seat counters are not part of EventRead.
+        """
+        stmt = (
+            update(Event)
+            .where(
+                Event.event_id == event_id,
+                or_(Event.capacity.is_(None), Event.seats_taken < Event.capacity)
+            )
+            .values(seats_taken=Event.seats_taken + 1, updated_at=Event.updated_at)
+            .returning(Event.hold_minutes)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).first()
+
+    @staticmethod
+    def release_seats(db: Session, released: dict[UUID, int]):
+        """
+        Gives back `count` seats per event (executemany), leaving updated_at
+        alone like reserve_seat. Not committed.
+        """
+        if not released:
+            return
+        stmt = (
+            update(Event.__table__)
+            .where(Event.__table__.c.event_id == bindparam("released_event_id"))
+            .values(
+                seats_taken=Event.__table__.c.seats_taken - bindparam("released_count"),
+                updated_at=Event.__table__.c.updated_at
+            )
+        )
+        db.execute(stmt, [
+            {"released_event_id": event_id, "released_count": count}
+            for event_id, count in released.items()
+        ])
+
+
+class AsyncEventRepository:
+    """
+    AsyncSession variants of the EventRepository hot paths.
+    """
+
+    @staticmethod
+    async def get_page(db: AsyncSession, limit: int, **filters) -> list[Row]:
+        stmt = EventRepository.page_query(limit, **filters)
+        result = await db.execute(stmt)
+        return list(result.all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, event_id: UUID) -> Event | None:
+        return await db.get(Event, event_id)
+
+    @staticmethod
+    async def get_detail(db: AsyncSession, event_id: UUID) -> Event | None:
+        """
+        Event with category (joined), sessions and organisers (one SELECT ... IN
+        each): three queries however many rows. Any other relationship raises
+        instead of lazy loading, so an N+1 cannot creep in unnoticed.
+        """
+        stmt = (
+            select(Event)
+            .where(Event.event_id == event_id)
+            .options(
+                joinedload(Event.category),
+                selectinload(Event.sessions),
+                selectinload(Event.organisers),
+                raiseload("*")
+            )
+        )
+        result = await db.execute(stmt)
+        return result.unique().scalar_one_or_none()
+
 
 # -------------------- ORGANISER --------------------
 
@@ -96,13 +213,150 @@ class EventRegistrationRepository:
     def get_by_event(
         db: Session,
         event_id: UUID
+    ) -> list[Row]:
+        # column rows only: no ORM objects or identity map for large lists
+        stmt = (
+            select(EventRegistration.__table__)
+            .where(EventRegistration.event_id == event_id)
+            .order_by(EventRegistration.registered_at.desc())
+        )
+        return list(db.execute(stmt).all())
+
+    @staticmethod
+    def confirm_many(db: Session, registration_ids: list[UUID]) -> list[Row]:
+        """
+        Confirms registrations unless they have been cancelled (e.g. the
+        hold expired first) and returns (registration_id, event_id) of the
+        registrations actually confirmed. Not committed: the caller commits
+        it with the payments.
+        """
+        if not registration_ids:
+            return []
+        stmt = (
+            update(EventRegistration)
+            .where(
+                EventRegistration.registration_id.in_(registration_ids),
+                EventRegistration.status != RegistrationStatus.cancelled
+            )
+            .values(status=RegistrationStatus.confirmed, hold_expires_at=None)
+            .returning(EventRegistration.registration_id, EventRegistration.event_id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(db.execute(stmt).all())
+
+    @staticmethod
+    def expire_holds(db: Session, batch_size: int) -> list[Row]:
+        """
+        Cancels up to `batch_size` pending registrations whose hold has
+        expired and returns their (registration_id, event_id) rows.
+        Not committed: seats are released in the same transaction.
+        """
+        expired = (
+            select(EventRegistration.registration_id)
+            .where(
+                EventRegistration.status == RegistrationStatus.pending,
+                EventRegistration.hold_expires_at < func.now()
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(EventRegistration)
+            .where(EventRegistration.registration_id.in_(expired.scalar_subquery()))
+            .values(status=RegistrationStatus.cancelled, hold_expires_at=None)
+            .returning(EventRegistration.registration_id, EventRegistration.event_id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(db.execute(stmt).all())
+
+    @staticmethod
+    def stream_by_event(
+        db: Session,
+        event_id: UUID,
+        status: RegistrationStatus | None = None,
+        batch_size: int = 1000
+    ):
+        """
+        Registrations of an event as batches of column rows, fetched through
+        a server-side cursor (yield_per), so memory does not grow with the
+        size of the event.
+        """
+        stmt = (
+            select(EventRegistration.__table__)
+            .where(EventRegistration.event_id == event_id)
+            .order_by(EventRegistration.registered_at.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        if status:
+            stmt = stmt.where(EventRegistration.status == status)
+        yield from db.execute(stmt).partitions()
+
+    @staticmethod
+    def resolve_for_event(
+        db: Session,
+        event_id: UUID,
+        registration_ids: list[UUID],
+        qr_codes: list[str]
+    ) -> list[tuple[UUID, str]]:
+        """
+        (registration_id, qr_code) for every registration of the event that
+        matches one of the given IDs or QR codes, in a single query.
+        """
+        conditions = []
+        if registration_ids:
+            conditions.append(EventRegistration.registration_id.in_(registration_ids))
+        if qr_codes:
+            conditions.append(EventRegistration.qr_code.in_(qr_codes))
+        if not conditions:
+            return []
+
+        stmt = (
+            select(EventRegistration.registration_id, EventRegistration.qr_code)
+            .where(EventRegistration.event_id == event_id, or_(*conditions))
+        )
+        return [tuple(row) for row in db.execute(stmt).all()]
+
+
+class AsyncEventRegistrationRepository:
+    """
+    AsyncSession variants of the EventRegistrationRepository hot paths.
+    """
+
+    @staticmethod
+    async def get_by_id(
+        db: AsyncSession,
+        registration_id: UUID
+    ) -> EventRegistration | None:
+        return await db.get(EventRegistration, registration_id)
+
+    @staticmethod
+    async def create(db: AsyncSession, registration: EventRegistration) -> EventRegistration:
+        db.add(registration)
+        await db.commit()
+        await db.refresh(registration)
+        return registration
+
+    @staticmethod
+    async def count_by_event(db: AsyncSession, event_id: UUID) -> int:
+        stmt = (
+            select(func.count())
+            .select_from(EventRegistration)
+            .where(EventRegistration.event_id == event_id)
+        )
+        return (await db.execute(stmt)).scalar_one()
+
+    @staticmethod
+    async def get_by_event(
+        db: AsyncSession,
+        event_id: UUID
     ) -> list[EventRegistration]:
-        return (
-            db.query(EventRegistration)
-            .filter(EventRegistration.event_id == event_id)
+        stmt = (
+            select(EventRegistration)
+            .where(EventRegistration.event_id == event_id)
             .order_by(EventRegistration.registered_at.desc())
-            .all()
         )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
 
 # -------------------- CHECK-IN --------------------
 
@@ -113,4 +367,34 @@ class CheckInRepository:
         db.add(checkin)
         db.commit()
         db.refresh(checkin)
-        return checkin
\ No newline at end of file
+        return checkin
+
+    @staticmethod
+    def get_checked_in(db: Session, registration_ids: list[UUID]) -> set[UUID]:
+        if not registration_ids:
+            return set()
+        stmt = (
+            select(CheckIn.registration_id)
+            .where(CheckIn.registration_id.in_(registration_ids))
+            .distinct()
+        )
+        return set(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def bulk_create(db: Session, rows: list[dict]) -> set[UUID]:
+        """
+        One multi-row INSERT ... ON CONFLICT (registration_id) DO NOTHING;
+        commits once. Returns the registration IDs actually checked in: the
+        others already were (e.g. scanned on another worker meanwhile).
+        """
+        inserted = set()
+        if rows:
+            stmt = (
+                pg_insert(CheckIn)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[CheckIn.registration_id])
+                .returning(CheckIn.registration_id)
+            )
+            inserted = set(db.execute(stmt).scalars().all())
+        db.commit()
+        return inserted
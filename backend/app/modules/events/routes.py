@@ -4,20 +4,33 @@
 # Uses FastAPI dependencies
 
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.database import get_db
-from ..users.auth import get_current_user
+from ...core.database import get_db, get_async_db_lazy
+from ...core.response_cache import response_cache
+from ...core.serialization import JSONBytesResponse, dump_json
+from ..users.auth import get_current_user, get_stream_user
 
-from .schema import EventCreate
+from .schema import EventCreate, EventPage, EventDetail
 from .schema import EventSessionCreate, EventRegistrationCreate
-from .schema import CheckInCreate
+from .schema import CheckInCreate, CheckInBatchCreate, CheckInBatchRead
+from .schema import EventRegistrationRead, EventRegistrationReadList
+from .models import RegistrationStatus
+from .export import EXPORT_MEDIA_TYPES
 
 from .services import (
     EventService,
     EventSessionService,
-    CheckInService
+    CheckInService,
+    EVENT_PAGE_SIZE_DEFAULT,
+    EVENT_PAGE_SIZE_MAX,
+    EVENT_LIST_CACHE_TAG,
+    event_cache_tag
 )
 
 router = APIRouter(prefix="/events", tags=["Events Management"])
@@ -29,34 +42,67 @@ router = APIRouter(prefix="/events", tags=["Events Management"])
 
 @router.get(
     "/",
-    summary="List all events"
+    response_model=EventPage,
+    summary="List events (cursor paginated)"
 )
-def list_events(
-    db: Session = Depends(get_db)
+async def list_events(
+    request: Request,
+    limit: int = Query(EVENT_PAGE_SIZE_DEFAULT, ge=1, le=EVENT_PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    category_id: UUID | None = None,
+    venue: str | None = None,
+    starts_from: datetime | None = None,
+    starts_to: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db_lazy)
 ):
     """
-    Get all events.
+    List events ordered by start date.
 
     - Public endpoint
     - No authentication required
+    - Pass `next_cursor` from the response as `cursor` to get the next page
+    - Filters: category, venue, start date range [starts_from, starts_to)
+    - Cached; supports ETag / If-None-Match
     """
-    return EventService.list_events(db)
+    async def produce() -> bytes:
+        page = await EventService.list_events_async(
+            db,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            venue=venue,
+            starts_from=starts_from,
+            starts_to=starts_to
+        )
+        return page.model_dump_json().encode()
+
+    key = f"events:list:{limit}:{cursor}:{category_id}:{venue}:{starts_from}:{starts_to}"
+    return await response_cache.respond(request, key, [EVENT_LIST_CACHE_TAG], produce)
 
 
 @router.get(
     "/{event_id}",
+    response_model=EventDetail,
     summary="Get event details"
 )
-def get_event(
+async def get_event(
     event_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_lazy)
 ):
     """
-    Get a single event by ID.
+    Get a single event by ID with its category, sessions and organisers.
 
     - Public endpoint
+    - Registrations are not embedded, only counted (`registration_count`)
+    - Cached; supports ETag / If-None-Match
     """
-    return EventService.get_event(db, event_id)
+    async def produce() -> bytes:
+        detail = await EventService.get_event_detail_async(db, event_id)
+        return detail.model_dump_json().encode()
+
+    key = f"events:detail:{event_id}"
+    return await response_cache.respond(request, key, [event_cache_tag(event_id)], produce)
 
 
 @router.post(
@@ -162,6 +208,33 @@ def create_event_session(
 # CHECK-IN ROUTES
 # =========================================================
 
+@router.post(
+    "/{event_id}/checkins/batch",
+    response_model=CheckInBatchRead,
+    summary="Upload buffered scans from a gate device (Admin/Staff/Volunteer)"
+)
+def check_in_batch(
+    event_id: UUID,
+    payload: CheckInBatchCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Bulk check-in for offline gate devices (up to 1000 scans per upload).
+
+    Each scan gets a per-item result:
+    - accepted: checked in now
+    - duplicate: already checked in (or repeated in this batch)
+    - unknown: no registration for this event matches the ID / QR code
+    """
+    return CheckInService.create_checkins_bulk(
+        db=db,
+        event_id=event_id,
+        payload=payload,
+        user_id=current_user.user_id
+    )
+
+
 @router.post(
     "/events/{event_id}/checkins/{registration_id}",
     status_code=status.HTTP_201_CREATED,
@@ -193,6 +266,8 @@ def check_in_attendee(
 
 @router.get(
     "/{event_id}/registrations",
+    response_model=list[EventRegistrationRead],
+    response_class=JSONBytesResponse,
     summary="List event registrations (Admin/Staff)"
 )
 def list_registrations(
@@ -208,8 +283,84 @@ def list_registrations(
     - Staff ✅
     - Volunteer ❌
     """
-    return EventService.list_registrations(
+    registrations = EventService.list_registrations(
         db=db,
         event_id=event_id,
         user_id=current_user.user_id
     )
+    return JSONBytesResponse(dump_json(EventRegistrationReadList, registrations))
+
+
+@router.get(
+    "/{event_id}/registrations/export",
+    response_class=StreamingResponse,
+    summary="Export event registrations as CSV or NDJSON (Admin/Staff)"
+)
+def export_registrations(
+    event_id: UUID,
+    format: Literal["csv", "ndjson"] = "csv",
+    registration_status: RegistrationStatus | None = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Stream all registrations of an event, newest first.
+
+    - Constant memory whatever the size of the event
+    - Optional filter: `status` (pending / confirmed / cancelled)
+
+    RBAC:
+    - Admin ✅
+    - Staff ✅
+    - Volunteer ❌
+    """
+    body = EventService.export_registrations(
+        db=db,
+        event_id=event_id,
+        user_id=current_user.user_id,
+        fmt=format,
+        status=registration_status
+    )
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="registrations-{event_id}.{format}"'}
+    )
+
+
+@router.get(
+    "/{event_id}/activity",
+    response_class=StreamingResponse,
+    summary="Live registration and check-in feed (Admin/Staff)"
+)
+def stream_event_activity(
+    event_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    current_user=Depends(get_stream_user)
+):
+    """
+    Server-sent events for organiser dashboards, one per committed change:
+
+    - `registration`: a new registration (same fields as the list)
+    - `registration_status`: confirmed by payment or cancelled (hold expired)
+    - `checkin`: an attendee checked in
+    - `resync`: the client fell behind or the feed (re)connected; reload the list once
+
+    Changes made on any worker reach every worker's streams (pg_notify;
+    ACTIVITY_FANOUT=local limits this to one process).
+
+    RBAC:
+    - Admin ✅
+    - Staff ✅
+    - Volunteer ❌
+    """
+    events = EventService.stream_activity(
+        db=db,
+        event_id=event_id,
+        user_id=current_user.user_id
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
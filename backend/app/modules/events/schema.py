@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, model_validator
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import Optional
@@ -97,8 +97,8 @@ class EventOrganiserRead(EventOrganiserBase):
 # ======================================================
 
 class CheckInBase(BaseSchema):
-    gate: str | None = None
-    device_id: str | None = None
+    gate: str | None = Field(default=None, max_length=50)            # CheckIn.gate String(50)
+    device_id: str | None = Field(default=None, max_length=100)      # CheckIn.device_id String(100)
 
 
 class CheckInCreate(CheckInBase):
@@ -111,6 +111,45 @@ class CheckInRead(CheckInBase):
     checkin_time: datetime
 
 
+class CheckInScan(CheckInBase):
+    """
+    One buffered scan from a gate device.
+    Either the registration ID or the QR code must be present.
+    """
+    registration_id: UUID | None = None
+    qr_code: str | None = None
+    scanned_at: datetime | None = None  # client clock, used as checkin_time
+
+    @model_validator(mode="after")
+    def require_identifier(self):
+        if self.registration_id is None and not self.qr_code:
+            raise ValueError("registration_id or qr_code is required")
+        return self
+
+
+class CheckInBatchCreate(BaseSchema):
+    scans: list[CheckInScan] = Field(min_length=1, max_length=1000)
+
+
+class ScanResult(str, Enum):
+    accepted = "accepted"
+    duplicate = "duplicate"
+    unknown = "unknown"
+
+
+class CheckInScanResult(BaseSchema):
+    index: int                      # position in the uploaded batch
+    result: ScanResult
+    registration_id: UUID | None = None
+
+
+class CheckInBatchRead(BaseSchema):
+    accepted: int
+    duplicate: int
+    unknown: int
+    results: list[CheckInScanResult]
+
+
 # ======================================================
 # Event Registration Schemas
 # ======================================================
@@ -127,12 +166,16 @@ class EventRegistrationCreate(EventRegistrationBase):
 
 
 class EventRegistrationRead(EventRegistrationBase):
+    # validated on the way in; re-running the email validator on output
+    # costs ~10x the rest of the row
+    email: str
     registration_id: UUID
     event_id: UUID
     user_id: UUID | None
     qr_code: str
     status: RegistrationStatus
     registered_at: datetime
+    hold_expires_at: datetime | None = None
 
 
 # ======================================================
@@ -148,6 +191,8 @@ class EventBase(BaseSchema):
     venue: str
     address: str
     banner_url: str | None = None
+    capacity: int | None = Field(default=None, ge=1)         # None = unlimited
+    hold_minutes: int | None = Field(default=None, ge=1)     # unpaid hold; None = no expiry
 
 
 class EventCreate(EventBase):
@@ -163,6 +208,8 @@ class EventUpdate(BaseSchema):
     venue: str | None = None
     address: str | None = None
     banner_url: str | None = None
+    capacity: int | None = Field(default=None, ge=1)
+    hold_minutes: int | None = Field(default=None, ge=1)
 
 
 class EventRead(EventBase):
@@ -172,8 +219,23 @@ class EventRead(EventBase):
     updated_at: datetime
 
 
+class EventPage(BaseSchema):
+    items: list[EventRead]
+    next_cursor: str | None = None
+
+
 class EventDetail(EventRead):
+    # kept out of EventRead so list pages do not change with every registration
+    seats_taken: int = 0
     category: EventCategoryRead
     sessions: list[EventSessionRead] = []
-    registrations: list[EventRegistrationRead] = []
     organisers: list[EventOrganiserRead] = []
+    # registrations are not embedded (can be 50k rows), see GET /{event_id}/registrations
+    registration_count: int = 0
+
+
+# ======================================================
+# Precompiled list serializers (see core/serialization.py)
+# ======================================================
+
+EventRegistrationReadList = TypeAdapter(list[EventRegistrationRead])
@@ -3,34 +3,90 @@
 #  Handles validation & rules
 #  NO FastAPI decorators
 
+import os
+import base64
+from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 from fastapi import HTTPException, status
+from sqlalchemy import event as orm_event, Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.cache import TTLCache
+from ...core.database import after_commit
+from ...core.metrics import metrics
+from ...core.response_cache import response_cache
+from ..scanners.counters import checkin_counters
+from ..scanners.index import scan_indexes
+from .activity import activity_hub
+from .export import stream_registrations
 from .models import (
     Event,
     EventCategory,
+    EventOrganiser,
     EventSession,
     EventRegistration,
     CheckIn,
-    OrganiserRole
+    OrganiserRole,
+    RegistrationStatus
 )
 from .repository import (
     EventRepository,
+    AsyncEventRepository,
+    AsyncEventRegistrationRepository,
     EventOrganiserRepository,
     EventSessionRepository,
     EventRegistrationRepository,
     CheckInRepository
 )
-from .schema import EventCreate, EventRegistrationCreate
+from .schema import EventCreate, EventRegistrationCreate, EventRegistrationRead, EventPage, EventDetail
 from .schema import EventSessionCreate
-from .schema import CheckInCreate
+from .schema import CheckInCreate, CheckInRead, CheckInBatchCreate, CheckInBatchRead
+from .schema import CheckInScanResult, ScanResult
+
+
+# -------------------- RESPONSE CACHE TAGS --------------------
+# GET /events/ pages depend on EVENT_LIST_CACHE_TAG, GET /events/{id} on
+# event_cache_tag(id); writers invalidate exactly the tags they change.
+
+EVENT_LIST_CACHE_TAG = "events"
+
+
+def event_cache_tag(event_id: UUID) -> str:
+    return f"event:{event_id}"
 
 
 # -------------------- RBAC CORE --------------------
 
+# (event_id, user_id) -> OrganiserRole, or None for "not an organiser"
+organiser_role_cache = TTLCache(
+    "organiser_roles",
+    maxsize=int(os.getenv("RBAC_CACHE_SIZE", 50000)),
+    ttl=int(os.getenv("RBAC_CACHE_TTL_SECONDS", 30))
+)
+
+_NOT_CACHED = object()
+
+
 class RBACService:
 
+    @staticmethod
+    def get_role(db: Session, user_id: UUID, event_id: UUID) -> OrganiserRole | None:
+        key = (event_id, user_id)
+        role = organiser_role_cache.get(key, _NOT_CACHED)
+        if role is not _NOT_CACHED:
+            return role
+
+        organiser = EventOrganiserRepository.get_user_role(
+            db=db,
+            user_id=user_id,
+            event_id=event_id
+        )
+        role = organiser.role if organiser else None
+        organiser_role_cache.set(key, role)
+        return role
+
     @staticmethod
     def require_roles(
         db: Session,
@@ -38,21 +94,48 @@ class RBACService:
         event_id: UUID,
         allowed_roles: list[OrganiserRole]
     ):
-        organiser = EventOrganiserRepository.get_user_role(
-            db=db,
-            user_id=user_id,
-            event_id=event_id
-        )
+        role = RBACService.get_role(db, user_id, event_id)
 
-        if not organiser or organiser.role not in allowed_roles:
+        if role is None or role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized"
             )
 
+    @staticmethod
+    def invalidate(user_id: UUID, event_id: UUID):
+        organiser_role_cache.pop((event_id, user_id))
+
+
+# keep cached roles and event details in step with organiser rows written through the ORM
+@orm_event.listens_for(EventOrganiser, "after_insert")
+@orm_event.listens_for(EventOrganiser, "after_update")
+@orm_event.listens_for(EventOrganiser, "after_delete")
+def _invalidate_organiser_role(mapper, connection, organiser: EventOrganiser):
+    # dropped once committed: a request reading between flush and commit
+    # still sees the old row and would cache it again (role or event detail)
+    user_id, event_id = organiser.user_id, organiser.event_id
+
+    def invalidate():
+        RBACService.invalidate(user_id, event_id)
+        response_cache.invalidate(event_cache_tag(event_id))
+
+    after_commit(Session.object_session(organiser), invalidate)
+
 
 # -------------------- EVENT SERVICE --------------------
 
+EVENT_PAGE_SIZE_DEFAULT = 20
+EVENT_PAGE_SIZE_MAX = 100
+
+# events whose last reservation found no free seat; lets an on-sale rush be
+# answered "sold out" without touching Postgres. Short TTL so seats released
+# by other workers become available again quickly.
+sold_out_events = TTLCache(
+    "sold_out_events",
+    maxsize=10000,
+    ttl=float(os.getenv("SOLD_OUT_CACHE_TTL_SECONDS", 2))
+)
 
 
 
@@ -94,11 +177,83 @@ class EventService:
             **payload.model_dump(),
             created_by=user_id
         )
-        return EventRepository.create(db, event)
+        event = EventRepository.create(db, event)
+        response_cache.invalidate(EVENT_LIST_CACHE_TAG)
+        return event
+
+    @staticmethod
+    def encode_cursor(event: Row) -> str:
+        raw = f"{event.start_date.isoformat()}|{event.event_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            start_date, event_id = raw.split("|", 1)
+            return datetime.fromisoformat(start_date), UUID(event_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def build_page(events: list[Row], limit: int) -> EventPage:
+        # repository is asked for limit + 1 rows to know whether another page exists
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = EventService.encode_cursor(events[-1])
+        return EventPage(items=events, next_cursor=next_cursor)
 
     @staticmethod
-    def list_events(db: Session) -> list[Event]:
-        return EventRepository.get_all(db)
+    def list_events(
+        db: Session,
+        limit: int = EVENT_PAGE_SIZE_DEFAULT,
+        cursor: str | None = None,
+        category_id: UUID | None = None,
+        venue: str | None = None,
+        starts_from: datetime | None = None,
+        starts_to: datetime | None = None
+    ) -> EventPage:
+        """
+        One keyset page of events ordered by start date.
+        Pass `next_cursor` from the previous page to continue.
+        """
+        limit = max(1, min(limit, EVENT_PAGE_SIZE_MAX))
+        events = EventRepository.get_page(
+            db,
+            limit=limit + 1,
+            after=EventService.decode_cursor(cursor) if cursor else None,
+            category_id=category_id,
+            venue=venue,
+            starts_from=starts_from,
+            starts_to=starts_to
+        )
+        return EventService.build_page(events, limit)
+
+    @staticmethod
+    async def list_events_async(
+        db: AsyncSession,
+        limit: int = EVENT_PAGE_SIZE_DEFAULT,
+        cursor: str | None = None,
+        category_id: UUID | None = None,
+        venue: str | None = None,
+        starts_from: datetime | None = None,
+        starts_to: datetime | None = None
+    ) -> EventPage:
+        limit = max(1, min(limit, EVENT_PAGE_SIZE_MAX))
+        events = await AsyncEventRepository.get_page(
+            db,
+            limit=limit + 1,
+            after=EventService.decode_cursor(cursor) if cursor else None,
+            category_id=category_id,
+            venue=venue,
+            starts_from=starts_from,
+            starts_to=starts_to
+        )
+        return EventService.build_page(events, limit)
 
     @staticmethod
     def get_event(db: Session, event_id: UUID) -> Event:
@@ -110,6 +265,23 @@ class EventService:
             )
         return event
     
+    @staticmethod
+    async def get_event_detail_async(db: AsyncSession, event_id: UUID) -> EventDetail:
+        """
+        Event with category, sessions, organisers and the registration count
+        in a fixed number of queries (see AsyncEventRepository.get_detail).
+        """
+        event = await AsyncEventRepository.get_detail(db, event_id)
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+
+        detail = EventDetail.model_validate(event)
+        detail.registration_count = await AsyncEventRegistrationRepository.count_by_event(db, event_id)
+        return detail
+    
     @staticmethod
     def delete_event(
         db: Session,
@@ -131,6 +303,9 @@ class EventService:
             )
 
         EventRepository.delete(db, event)
+        # organiser rows went with the event (ON DELETE CASCADE), bypassing the ORM hooks
+        organiser_role_cache.clear()
+        response_cache.invalidate(EVENT_LIST_CACHE_TAG, event_cache_tag(event_id))
 
     @staticmethod
     def register_user(
@@ -138,28 +313,58 @@ class EventService:
         event_id: UUID,
         payload: EventRegistrationCreate
     ) -> EventRegistration:
-        event = EventRepository.get_by_id(db, event_id)
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found")
-
+        """
+        Reserve a seat and create the registration in one transaction:
+        conditional UPDATE on the event's seat counter, INSERT, COMMIT.
+        A full event is refused before anything is written.
+        """
+        if sold_out_events.get(event_id):
+            metrics.inc("events.sold_out_rejections")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Event is sold out")
+
+        seat = EventRepository.reserve_seat(db, event_id)
+        if seat is None:
+            db.rollback()
+            if not EventRepository.get_by_id(db, event_id):
+                raise HTTPException(status_code=404, detail="Event not found")
+            sold_out_events.set(event_id, True)
+            metrics.inc("events.sold_out_rejections")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Event is sold out")
+
+        hold_minutes = seat.hold_minutes
         registration = EventRegistration(
             event_id=event_id,
             user_id=payload.user_id,
             name=payload.name,
             email=payload.email,
             phone=payload.phone,
-            qr_code=str(uuid4())
+            qr_code=str(uuid4()),
+            hold_expires_at=datetime.now(timezone.utc) + timedelta(minutes=hold_minutes) if hold_minutes else None
         )
 
-        return EventRegistrationRepository.create(db, registration)
+        # sent with the commit in create()
+        activity_hub.publish(db, event_id, "registration", registration, EventRegistrationRead)
+        registration = EventRegistrationRepository.create(db, registration)
+        scan_indexes.add_code(event_id, registration.registration_id, registration.qr_code)
+        # registration_count in the event detail
+        response_cache.invalidate(event_cache_tag(event_id))
+        return registration
 
 
+    @staticmethod
+    def seats_released(event_id: UUID):
+        """
+        Called after seats of an event were given back (expired holds).
+        """
+        sold_out_events.pop(event_id)
+        response_cache.invalidate(event_cache_tag(event_id))
+
     @staticmethod
     def list_registrations(
         db: Session,
         event_id: UUID,
         user_id: UUID
-    ) -> list[EventRegistration]:
+    ) -> list[Row]:
         """
         List all registrations for an event.
         Only organisers/staff can view registrations.
@@ -180,6 +385,48 @@ class EventService:
             event_id=event_id
         )
 
+    @staticmethod
+    def export_registrations(
+        db: Session,
+        event_id: UUID,
+        user_id: UUID,
+        fmt: str = "csv",
+        status: RegistrationStatus | None = None
+    ):
+        """
+        Streamed CSV / NDJSON export of an event's registrations.
+        Same access rule as list_registrations; returns the body iterator.
+        """
+        RBACService.require_roles(
+            db=db,
+            user_id=user_id,
+            event_id=event_id,
+            allowed_roles=[
+                OrganiserRole.admin,
+                OrganiserRole.staff
+            ]
+        )
+
+        return stream_registrations(event_id, fmt=fmt, status=status)
+
+    @staticmethod
+    def stream_activity(db: Session, event_id: UUID, user_id: UUID):
+        """
+        Live feed of registration and check-in changes (server-sent events).
+        Same access rule as list_registrations; returns the event iterator.
+        """
+        RBACService.require_roles(
+            db=db,
+            user_id=user_id,
+            event_id=event_id,
+            allowed_roles=[
+                OrganiserRole.admin,
+                OrganiserRole.staff
+            ]
+        )
+
+        return activity_hub.stream(event_id)
+
 
 # -------------------- SESSION SERVICE --------------------
 
@@ -206,7 +453,9 @@ class EventSessionService:
             event_id=event_id,
             **payload.model_dump()
         )
-        return EventSessionRepository.create(db, session)
+        session = EventSessionRepository.create(db, session)
+        response_cache.invalidate(event_cache_tag(event_id))
+        return session
 
 
 # -------------------- CHECK-IN SERVICE --------------------
@@ -237,7 +486,7 @@ class CheckInService:
             registration_id
         )
 
-        if not registration:
+        if not registration or registration.event_id != event_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Registration not found"
@@ -248,4 +497,100 @@ class CheckInService:
             **payload.model_dump()
         )
 
-        return CheckInRepository.create(db, checkin)
\ No newline at end of file
+        activity_hub.publish(db, event_id, "checkin", checkin, CheckInRead)
+        try:
+            checkin = CheckInRepository.create(db, checkin)
+        except IntegrityError:
+            # checkins.registration_id is unique
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Already checked in"
+            )
+        scan_indexes.mark_checked_in(event_id, [registration_id])
+        checkin_counters.record(db, event_id, checkin.checkin_time, checkin.gate, checkin.device_id)
+        return checkin
+
+    @staticmethod
+    def create_checkins_bulk(
+        db: Session,
+        event_id: UUID,
+        payload: CheckInBatchCreate,
+        user_id: UUID
+    ) -> CheckInBatchRead:
+        """
+        Ingest a batch of buffered scans with set-based lookups:
+        one query to resolve registrations, one for existing check-ins,
+        one multi-row INSERT and a single commit.
+        """
+        RBACService.require_roles(
+            db,
+            user_id,
+            event_id,
+            allowed_roles=[
+                OrganiserRole.admin,
+                OrganiserRole.staff,
+                OrganiserRole.volunteer
+            ]
+        )
+
+        scans = payload.scans
+        resolved = EventRegistrationRepository.resolve_for_event(
+            db,
+            event_id,
+            registration_ids=[s.registration_id for s in scans if s.registration_id],
+            qr_codes=[s.qr_code for s in scans if s.qr_code]
+        )
+        known_ids = {registration_id for registration_id, _ in resolved}
+        by_qr = {qr_code: registration_id for registration_id, qr_code in resolved}
+
+        checked_in = CheckInRepository.get_checked_in(db, list(known_ids))
+        now = datetime.now(timezone.utc)
+
+        rows = []
+        results = []
+        for index, scan in enumerate(scans):
+            registration_id = scan.registration_id
+            if registration_id not in known_ids:
+                registration_id = by_qr.get(scan.qr_code)
+
+            if registration_id is None:
+                result = ScanResult.unknown
+            elif registration_id in checked_in:
+                result = ScanResult.duplicate
+            else:
+                result = ScanResult.accepted
+                checked_in.add(registration_id)  # later scans in this batch are duplicates
+                rows.append({
+                    "checkin_id": uuid4(),
+                    "registration_id": registration_id,
+                    "gate": scan.gate,
+                    "device_id": scan.device_id,
+                    "checkin_time": scan.scanned_at or now
+                })
+
+            results.append(CheckInScanResult(
+                index=index,
+                result=result,
+                registration_id=registration_id
+            ))
+
+        inserted = CheckInRepository.bulk_create(db, rows)
+        if len(inserted) < len(rows):
+            # checked in elsewhere since get_checked_in above
+            for r in results:
+                if r.result == ScanResult.accepted and r.registration_id not in inserted:
+                    r.result = ScanResult.duplicate
+            rows = [row for row in rows if row["registration_id"] in inserted]
+        scan_indexes.mark_checked_in(event_id, [row["registration_id"] for row in rows])
+        for row in rows:
+            checkin_counters.record(db, event_id, row["checkin_time"], row["gate"], row["device_id"])
+            # committed already; only the rows that were inserted
+            activity_hub.publish(None, event_id, "checkin", row)
+
+        return CheckInBatchRead(
+            accepted=sum(r.result == ScanResult.accepted for r in results),
+            duplicate=sum(r.result == ScanResult.duplicate for r in results),
+            unknown=sum(r.result == ScanResult.unknown for r in results),
+            results=results
+        )
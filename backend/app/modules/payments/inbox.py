@@ -0,0 +1,105 @@
+# inbox.py
+# Applies payment webhook events from the inbox table.
+#
+# Webhooks only append to payment_webhook_events (a duplicate delivery is a
+# no-op insert), so their latency does not depend on this work. Here events
+# are taken oldest first in batches; each batch updates payments, confirms
+# registrations and marks the events processed in one transaction. Started
+# from the app lifespan.
+
+import asyncio
+import logging
+import os
+from time import perf_counter
+
+from ...core.database import SessionLocal
+from ...core.metrics import metrics
+from ..events.activity import activity_hub
+from ..events.models import RegistrationStatus
+from ..events.repository import EventRegistrationRepository
+from .models import PaymentStatus
+from .repository import PaymentRepository, PaymentInboxRepository
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_INBOX_INTERVAL_SECONDS = int(os.getenv("PAYMENT_INBOX_INTERVAL_SECONDS", 1))
+PAYMENT_INBOX_BATCH_SIZE = int(os.getenv("PAYMENT_INBOX_BATCH_SIZE", 500))
+PAYMENT_INBOX_MAX_BATCHES = int(os.getenv("PAYMENT_INBOX_MAX_BATCHES", 20))
+
+
+def apply_batch(db, batch_size: int) -> int:
+    """
+    Applies one batch and commits. Returns the number of events taken.
+    """
+    events = PaymentInboxRepository.claim_batch(db, batch_size)
+    if not events:
+        db.rollback()
+        return 0
+
+    # events are in arrival order: the first outcome for a pending payment
+    # wins, anything after it is rejected and kept with its error
+    errors = PaymentRepository.apply_statuses(db, [
+        {"payment_id": event.payment_id, "status": event.status, "transaction_id": event.transaction_id}
+        for event in events
+    ])
+    paid = [
+        event.registration_id
+        for event in events
+        if event.status == PaymentStatus.completed and event.transaction_id not in errors
+    ]
+    errors |= {event.transaction_id: None for event in events if event.transaction_id not in errors}
+    confirmed = EventRegistrationRepository.confirm_many(db, paid)
+    PaymentInboxRepository.mark_processed(db, errors)
+    for registration in confirmed:
+        activity_hub.publish(db, registration.event_id, "registration_status", {
+            "registration_id": registration.registration_id,
+            "status": RegistrationStatus.confirmed
+        })
+    db.commit()
+
+    rejected = sum(1 for e in errors.values() if e)
+    metrics.inc("payments.inbox.applied", len(events) - rejected)
+    if rejected:
+        metrics.inc("payments.inbox.rejected", rejected)
+    if len(confirmed) < len(paid):
+        # holds expired before the payment landed; those payments need a refund
+        metrics.inc("payments.completed_without_registration", len(paid) - len(confirmed))
+        logger.warning("%d payments completed for cancelled registrations", len(paid) - len(confirmed))
+    return len(events)
+
+
+def apply_webhook_events(
+    batch_size: int = PAYMENT_INBOX_BATCH_SIZE,
+    max_batches: int = PAYMENT_INBOX_MAX_BATCHES
+) -> int:
+    """
+    One pass in bounded batches (one short transaction per batch).
+    Returns the number of inbox events processed.
+    """
+    started = perf_counter()
+    processed_total = 0
+    with SessionLocal() as db:
+        for _ in range(max_batches):
+            batch = apply_batch(db, batch_size)
+            processed_total += batch
+            if batch < batch_size:
+                break
+
+    if processed_total:
+        metrics.observe("payments.inbox.run", perf_counter() - started)
+    return processed_total
+
+
+async def run_inbox_applier(interval: int = PAYMENT_INBOX_INTERVAL_SECONDS):
+    """
+    Runs apply_webhook_events every `interval` seconds in a worker thread until cancelled.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(apply_webhook_events)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.inc("payments.inbox.failures")
+            logger.exception("Payment inbox apply failed")
+        await asyncio.sleep(interval)
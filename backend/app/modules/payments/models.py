@@ -1,7 +1,8 @@
-from sqlalchemy import String, Float, Enum, DateTime, func, ForeignKey
+from sqlalchemy import String, Float, Enum, DateTime, func, ForeignKey, Index, text, Integer, Numeric
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
+from decimal import Decimal
 from uuid import uuid4
 import enum
 from app.core.database import Base
@@ -36,9 +37,61 @@ class Payment(Base):
         nullable=False
     ) 
 
-    transaction_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # set by the provider callback; a new payment has none yet
+    transaction_id: Mapped[UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # relationship
     registration = relationship("EventRegistration", back_populates="payments")
+
+
+class PaymentWebhookEvent(Base):
+    """
+    Inbox of provider webhook deliveries, one row per provider transaction.
+    Webhooks only append here; payments.inbox applies them in batches.
+    """
+    __tablename__ = "payment_webhook_events"
+    __table_args__ = (
+        # the applier's scan: unprocessed events, oldest first
+        Index(
+            "ix_payment_webhook_events_unprocessed",
+            "received_at",
+            postgresql_where=text("processed_at IS NULL")
+        ),
+    )
+
+    transaction_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    payment_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    status: Mapped[PaymentStatus] = mapped_column(
+        Enum(PaymentStatus, name="payment_status_enum"),
+        nullable=False
+    )
+
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+
+class EventPaymentTotal(Base):
+    """
+    Running count and sum of payments per event, status and currency.
+    Kept up to date by PaymentRepository in the same transaction as the
+    payment write; payments.totals rebuilds it from scratch.
+    """
+    __tablename__ = "event_payment_totals"
+
+    event_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.event_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    status: Mapped[PaymentStatus] = mapped_column(
+        Enum(PaymentStatus, name="payment_status_enum"),
+        primary_key=True
+    )
+    currency: Mapped[str] = mapped_column(String(10), primary_key=True)
+
+    payment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    amount_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, server_default="0", nullable=False)
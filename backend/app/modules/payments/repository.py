@@ -1,32 +1,255 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import select, update, delete, insert, func, bindparam, literal, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from ..events.models import EventRegistration
+from .models import Payment, PaymentStatus, PaymentWebhookEvent, EventPaymentTotal
+
+# pg advisory lock key for PaymentTotalsRepository.rebuild
+TOTALS_REBUILD_LOCK_ID = 2301
+
 
 class PaymentRepository:
 
     @staticmethod
     def create_payment(db, registration_id: UUID, amount: float, currency: str):
-        from .models import Payment
         payment = Payment(
             registration_id=registration_id,
             amount=amount,
             currency=currency,
-            status="pending"
+            status=PaymentStatus.pending
         )
         db.add(payment)
+        db.flush()
+        PaymentTotalsRepository.add_for_registration(db, registration_id, PaymentStatus.pending, currency, amount)
         db.commit()
         db.refresh(payment)
         return payment
 
     @staticmethod
-    def update_payment_status(db, payment_id: UUID, status: str, transaction_id: str):
-        from .models import Payment
-        payment = db.query(Payment).filter(Payment.payment_id == payment_id).first()
-        if payment:
-            payment.status = status
-            payment.transaction_id = transaction_id
-            db.commit()
-            db.refresh(payment)
-        return payment
+    def apply_statuses(db: Session, updates: list[dict]) -> dict[UUID, str]:
+        """
+        Sets status and transaction ID for many payments (executemany).
+        `updates` holds payment_id, status and transaction_id, in arrival
+        order. Only pending payments move: the first outcome for a payment
+        wins and later ones (or one for a payment that is already completed
+        or failed) are rejected. Returns {transaction_id: error} for the
+        rejected updates. Event totals are adjusted from the locked current
+        statuses. Not committed.
+        """
+        if not updates:
+            return {}
+        table = Payment.__table__
+        current = db.execute(
+            select(table.c.payment_id, table.c.status, table.c.currency, table.c.amount, EventRegistration.event_id)
+            .join(EventRegistration, EventRegistration.registration_id == table.c.registration_id)
+            .where(table.c.payment_id.in_({u["payment_id"] for u in updates}))
+            .with_for_update(of=table)
+        ).all()
+        payments = {p.payment_id: p for p in current}
+        statuses = {p.payment_id: p.status for p in current}
+        accepted, changes, rejected = [], [], {}
+        for u in updates:
+            p = payments.get(u["payment_id"])
+            if p is None:
+                rejected[u["transaction_id"]] = "unknown payment"
+            elif statuses[p.payment_id] != PaymentStatus.pending:
+                rejected[u["transaction_id"]] = f"payment already {statuses[p.payment_id].value}"
+            else:
+                accepted.append(u)
+                changes.append((p.event_id, p.currency, p.amount, PaymentStatus.pending, u["status"]))
+                statuses[p.payment_id] = u["status"]
+
+        if accepted:
+            stmt = (
+                update(table)
+                .where(
+                    table.c.payment_id == bindparam("updated_payment_id"),
+                    table.c.status == PaymentStatus.pending
+                )
+                .values(status=bindparam("updated_status"), transaction_id=bindparam("updated_transaction_id"))
+            )
+            db.execute(stmt, [
+                {
+                    "updated_payment_id": u["payment_id"],
+                    "updated_status": u["status"],
+                    "updated_transaction_id": u["transaction_id"]
+                }
+                for u in accepted
+            ])
+            PaymentTotalsRepository.add(db, PaymentTotalsRepository.transitions(changes))
+        return rejected
+
+
+class PaymentTotalsRepository:
+
+    @staticmethod
+    def transitions(changes: list[tuple]) -> dict[tuple, list]:
+        """
+        (event_id, currency, amount, old_status, new_status) per changed
+        payment -> {(event_id, status, currency): [count_delta, amount_delta]}.
+        """
+        deltas = defaultdict(lambda: [0, Decimal(0)])
+        for event_id, currency, amount, old, new in changes:
+            if old == new:
+                continue
+            amount = Decimal(str(amount))
+            deltas[(event_id, old, currency)][0] -= 1
+            deltas[(event_id, old, currency)][1] -= amount
+            deltas[(event_id, new, currency)][0] += 1
+            deltas[(event_id, new, currency)][1] += amount
+        return deltas
+
+    @staticmethod
+    def _upsert():
+        stmt = pg_insert(EventPaymentTotal)
+        return stmt.on_conflict_do_update(
+            index_elements=[EventPaymentTotal.event_id, EventPaymentTotal.status, EventPaymentTotal.currency],
+            set_={
+                "payment_count": EventPaymentTotal.payment_count + stmt.excluded.payment_count,
+                "amount_total": EventPaymentTotal.amount_total + stmt.excluded.amount_total
+            }
+        )
+
+    @staticmethod
+    def add(db: Session, deltas: dict[tuple, list]):
+        """
+        Adds count/amount deltas (INSERT ... ON CONFLICT DO UPDATE, executemany).
+        Not committed.
+        """
+        if not deltas:
+            return
+        db.execute(PaymentTotalsRepository._upsert(), [
+            {
+                "event_id": event_id, "status": status, "currency": currency,
+                "payment_count": count, "amount_total": amount
+            }
+            for (event_id, status, currency), (count, amount) in deltas.items()
+        ])
+
+    @staticmethod
+    def add_for_registration(db: Session, registration_id: UUID, status: PaymentStatus, currency: str, amount: float):
+        """
+        Counts one new payment, looking up the event in the same statement.
+        Not committed.
+        """
+        event_id = (
+            select(EventRegistration.event_id)
+            .where(EventRegistration.registration_id == registration_id)
+            .scalar_subquery()
+        )
+        db.execute(PaymentTotalsRepository._upsert().values(
+            event_id=event_id, status=status, currency=currency,
+            payment_count=1, amount_total=Decimal(str(amount))
+        ))
+
+    @staticmethod
+    def get_for_event(db: Session, event_id: UUID) -> list[EventPaymentTotal]:
+        stmt = (
+            select(EventPaymentTotal)
+            .where(EventPaymentTotal.event_id == event_id, EventPaymentTotal.payment_count != 0)
+            .order_by(EventPaymentTotal.status, EventPaymentTotal.currency)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def try_lock_rebuild(db: Session) -> bool:
+        """
+        Transaction-level advisory lock so only one worker rebuilds at a time.
+        """
+        return db.execute(select(func.pg_try_advisory_xact_lock(TOTALS_REBUILD_LOCK_ID))).scalar_one()
+
+    @staticmethod
+    def rebuild(db: Session, event_id: UUID | None = None) -> int:
+        """
+        Replaces the totals (of one event, or all) with a fresh aggregate
+        over payments and returns the number of rows written.
+        Not committed.
+        """
+        wipe = delete(EventPaymentTotal)
+        aggregate = (
+            select(
+                EventRegistration.event_id,
+                Payment.status,
+                Payment.currency,
+                func.count(),
+                func.coalesce(func.sum(Payment.amount), literal(0))
+            )
+            .join(EventRegistration, EventRegistration.registration_id == Payment.registration_id)
+            .group_by(EventRegistration.event_id, Payment.status, Payment.currency)
+        )
+        if event_id is not None:
+            wipe = wipe.where(EventPaymentTotal.event_id == event_id)
+            aggregate = aggregate.where(EventRegistration.event_id == event_id)
+
+        db.execute(wipe)
+        result = db.execute(
+            insert(EventPaymentTotal).from_select(
+                ["event_id", "status", "currency", "payment_count", "amount_total"],
+                aggregate
+            )
+        )
+        return result.rowcount
+
 
+class PaymentInboxRepository:
 
+    @staticmethod
+    def append(db: Session, transaction_id: UUID, payment_id: UUID, status: PaymentStatus) -> bool:
+        """
+        INSERT ... ON CONFLICT (transaction_id) DO NOTHING and commit.
+        Returns False for a duplicate delivery.
+        """
+        stmt = (
+            pg_insert(PaymentWebhookEvent)
+            .values(transaction_id=transaction_id, payment_id=payment_id, status=status)
+            .on_conflict_do_nothing(index_elements=[PaymentWebhookEvent.transaction_id])
+            .returning(PaymentWebhookEvent.transaction_id)
+        )
+        inserted = db.execute(stmt).first() is not None
+        db.commit()
+        return inserted
+
+    @staticmethod
+    def claim_batch(db: Session, batch_size: int) -> list[Row]:
+        """
+        Oldest unprocessed events with their payment's registration_id (None
+        for an unknown payment), locked until the caller's transaction ends.
+        SKIP LOCKED lets several workers drain the inbox side by side.
+        """
+        stmt = (
+            select(
+                PaymentWebhookEvent.transaction_id,
+                PaymentWebhookEvent.payment_id,
+                PaymentWebhookEvent.status,
+                Payment.registration_id
+            )
+            .outerjoin(Payment, Payment.payment_id == PaymentWebhookEvent.payment_id)
+            .where(PaymentWebhookEvent.processed_at.is_(None))
+            .order_by(PaymentWebhookEvent.received_at)
+            .limit(batch_size)
+            .with_for_update(of=PaymentWebhookEvent, skip_locked=True)
+        )
+        return list(db.execute(stmt).all())
+
+    @staticmethod
+    def mark_processed(db: Session, errors: dict[UUID, str | None]):
+        """
+        Stamps processed_at (and an error, if any) per transaction ID
+        (executemany). Not committed.
+        """
+        if not errors:
+            return
+        table = PaymentWebhookEvent.__table__
+        stmt = (
+            update(table)
+            .where(table.c.transaction_id == bindparam("processed_transaction_id"))
+            .values(processed_at=func.now(), error=bindparam("processed_error"))
+        )
+        db.execute(stmt, [
+            {"processed_transaction_id": transaction_id, "processed_error": error}
+            for transaction_id, error in errors.items()
+        ])
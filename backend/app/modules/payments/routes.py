@@ -4,7 +4,8 @@ from uuid import UUID
 
 from ...core.database import get_db
 from ..users.auth import get_current_user
-from .schema import PaymentCreate, PaymentRead
+from .models import PaymentStatus
+from .schema import PaymentCreate, PaymentRead, PaymentWebhookAck, EventPaymentTotals
 from .services import PaymentService
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
@@ -22,17 +23,32 @@ def initiate_payment(payload: PaymentCreate, db: Session = Depends(get_db), curr
     )
 
 
-@router.post("/{payment_id}/complete", response_model=PaymentRead)
-def complete_payment(payment_id: UUID, transaction_id: str, db: Session = Depends(get_db)):
+@router.post("/{payment_id}/complete", response_model=PaymentWebhookAck, status_code=status.HTTP_202_ACCEPTED)
+def complete_payment(payment_id: UUID, transaction_id: UUID, db: Session = Depends(get_db)):
     """
-    Mark payment as completed
+    Record a completed payment; applied to the payment and its registration in the background
     """
-    return PaymentService.complete_payment(db=db, payment_id=payment_id, transaction_id=transaction_id)
+    accepted = PaymentService.record_webhook(db, payment_id, transaction_id, PaymentStatus.completed)
+    return PaymentWebhookAck(
+        transaction_id=transaction_id, payment_id=payment_id, status=PaymentStatus.completed, duplicate=not accepted
+    )
+
+
+@router.post("/{payment_id}/fail", response_model=PaymentWebhookAck, status_code=status.HTTP_202_ACCEPTED)
+def fail_payment(payment_id: UUID, transaction_id: UUID, db: Session = Depends(get_db)):
+    """
+    Record a failed payment; applied in the background
+    """
+    accepted = PaymentService.record_webhook(db, payment_id, transaction_id, PaymentStatus.failed)
+    return PaymentWebhookAck(
+        transaction_id=transaction_id, payment_id=payment_id, status=PaymentStatus.failed, duplicate=not accepted
+    )
 
 
-@router.post("/{payment_id}/fail", response_model=PaymentRead)
-def fail_payment(payment_id: UUID, transaction_id: str, db: Session = Depends(get_db)):
+@router.get("/events/{event_id}/totals", response_model=EventPaymentTotals)
+def event_payment_totals(event_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     """
-    Mark payment as failed
+    Revenue dashboard: payment count and amount per status and currency
     """
-    return PaymentService.fail_payment(db=db, payment_id=payment_id, transaction_id=transaction_id)
+    totals = PaymentService.get_event_totals(db=db, event_id=event_id, user_id=current_user.user_id)
+    return EventPaymentTotals(event_id=event_id, totals=totals)
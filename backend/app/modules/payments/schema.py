@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from uuid import UUID
+from decimal import Decimal
 from enum import Enum
 
 class PaymentStatus(str, Enum):
@@ -18,7 +19,29 @@ class PaymentRead(BaseModel):
     amount: float
     currency: str
     status: PaymentStatus
-    transaction_id: str | None
+    transaction_id: UUID | None
 
     class Config:
         from_attributes = True
+
+
+class PaymentWebhookAck(BaseModel):
+    transaction_id: UUID
+    payment_id: UUID
+    status: PaymentStatus
+    duplicate: bool
+
+
+class PaymentTotalRead(BaseModel):
+    status: PaymentStatus
+    currency: str
+    payment_count: int
+    amount_total: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class EventPaymentTotals(BaseModel):
+    event_id: UUID
+    totals: list[PaymentTotalRead]
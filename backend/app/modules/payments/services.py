@@ -1,7 +1,13 @@
 from uuid import UUID
-from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from ...core.metrics import metrics
+from ..events.models import OrganiserRole
+from ..events.services import RBACService
+from .models import PaymentStatus
+from .repository import PaymentRepository, PaymentInboxRepository, PaymentTotalsRepository
+
+
 class PaymentService:
 
     @staticmethod
@@ -9,27 +15,28 @@ class PaymentService:
         """
         Create a payment entry with status 'pending'
         """
-        from .repository import PaymentRepository
         return PaymentRepository.create_payment(db, registration_id, amount, currency)
 
     @staticmethod
-    def complete_payment(db, payment_id: UUID, transaction_id: str):
+    def record_webhook(db: Session, payment_id: UUID, transaction_id: UUID, outcome: PaymentStatus) -> bool:
         """
-        Mark payment as completed and update registration
+        Appends a provider callback to the inbox; payments.inbox applies it.
+        Returns False for a duplicate delivery of the same transaction.
         """
-        from .repository import PaymentRepository
-        payment = PaymentRepository.update_payment_status(db, payment_id, "completed", transaction_id)
-
-        # Update the registration status to confirmed
-        if payment:
-            from .models import EventRegistration
-            registration = db.query(EventRegistration).filter(EventRegistration.registration_id == payment.registration_id).first()
-            if registration:
-                registration.status = "confirmed"
-                db.commit()
-        return payment
+        accepted = PaymentInboxRepository.append(db, transaction_id, payment_id, outcome)
+        metrics.inc("payments.webhooks" if accepted else "payments.webhooks_duplicate")
+        return accepted
 
     @staticmethod
-    def fail_payment(db, payment_id: UUID, transaction_id: str):
-        from .repository import PaymentRepository
-        return PaymentRepository.update_payment_status(db, payment_id, "failed", transaction_id)
+    def get_event_totals(db: Session, event_id: UUID, user_id: UUID):
+        """
+        Payment count and amount per status and currency for an event, read
+        from the maintained totals (no scan over payments). Event admins only.
+        """
+        RBACService.require_roles(
+            db=db,
+            user_id=user_id,
+            event_id=event_id,
+            allowed_roles=[OrganiserRole.admin]
+        )
+        return PaymentTotalsRepository.get_for_event(db, event_id)
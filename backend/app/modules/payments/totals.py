@@ -0,0 +1,56 @@
+# totals.py
+# Rebuilds event_payment_totals from the payments table.
+#
+# The totals are maintained incrementally by every payment write; this
+# periodic pass corrects any drift (manual SQL fixes, rows written before
+# the table existed). Started from the app lifespan.
+
+import asyncio
+import logging
+import os
+from time import perf_counter
+from uuid import UUID
+
+from ...core.database import SessionLocal
+from ...core.metrics import metrics
+from .repository import PaymentTotalsRepository
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_TOTALS_RECONCILE_ENABLED = os.getenv("PAYMENT_TOTALS_RECONCILE_ENABLED", "true").lower() == "true"
+PAYMENT_TOTALS_RECONCILE_INTERVAL_SECONDS = int(os.getenv("PAYMENT_TOTALS_RECONCILE_INTERVAL_SECONDS", 3600))
+
+
+def reconcile_totals(event_id: UUID | None = None) -> int | None:
+    """
+    Rebuilds the totals of one event, or all of them, in one transaction.
+    Returns the number of rows written, or None if another worker holds the
+    rebuild lock.
+    """
+    started = perf_counter()
+    with SessionLocal() as db:
+        if not PaymentTotalsRepository.try_lock_rebuild(db):
+            return None
+        rows = PaymentTotalsRepository.rebuild(db, event_id)
+        db.commit()
+
+    elapsed = perf_counter() - started
+    metrics.observe("payments.totals.reconcile", elapsed)
+    logger.info("Rebuilt %d payment total rows in %.2fs", rows, elapsed)
+    return rows
+
+
+async def run_totals_reconciler(interval: int = PAYMENT_TOTALS_RECONCILE_INTERVAL_SECONDS):
+    """
+    Runs reconcile_totals every `interval` seconds in a worker thread until cancelled.
+    The first run waits one interval: the totals are current after a restart.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(reconcile_totals)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.inc("payments.totals.reconcile_failures")
+            logger.exception("Payment totals reconcile failed")
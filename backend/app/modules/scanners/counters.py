@@ -0,0 +1,228 @@
+# counters.py
+# Live check-in counters per event, gate, device and minute.
+#
+# Each process counts the check-ins it handles and checkpoints the
+# increments to checkin_counts from a lifespan task. After every checkpoint
+# the counters are re-read from checkin_counts (plus what is still pending
+# locally), so every worker also shows the other workers' check-ins, at
+# most about one checkpoint interval late. A restart continues from the
+# last checkpoint (a crash loses at most one interval of increments).
+
+import asyncio
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from .models import CheckInCount
+from .repository import CheckInCountRepository
+from .schema import CheckInCounters
+
+logger = logging.getLogger(__name__)
+
+CHECKIN_COUNTER_CHECKPOINT_SECONDS = int(os.getenv("CHECKIN_COUNTER_CHECKPOINT_SECONDS", 10))
+# per-minute history returned by the endpoint and the stream
+CHECKIN_COUNTER_RECENT_MINUTES = int(os.getenv("CHECKIN_COUNTER_RECENT_MINUTES", 60))
+# how often a stream looks for changes; updates in between are coalesced
+CHECKIN_COUNTER_PUSH_INTERVAL_MS = int(os.getenv("CHECKIN_COUNTER_PUSH_INTERVAL_MS", 500))
+CHECKIN_COUNTER_HEARTBEAT_SECONDS = int(os.getenv("CHECKIN_COUNTER_HEARTBEAT_SECONDS", 15))
+
+# keys are cut to what checkin_counts can store, so one oversized gate or
+# device name cannot make every checkpoint fail
+GATE_LENGTH = CheckInCount.__table__.c.gate.type.length
+DEVICE_ID_LENGTH = CheckInCount.__table__.c.device_id.type.length
+
+
+def _minute(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+class EventCheckInCounters:
+    """
+    Running totals for one event plus the increments not checkpointed yet.
+    `version` changes on every update so streams can tell when to push.
+    """
+
+    def __init__(self, event_id: UUID):
+        self.event_id = event_id
+        self.version = 0
+        self._lock = threading.Lock()
+        self._total = 0
+        self._by_gate: Counter[str] = Counter()
+        self._by_device: Counter[str] = Counter()
+        self._by_minute: Counter[datetime] = Counter()
+        self._pending: Counter[tuple] = Counter()
+
+    def _add(self, minute: datetime, gate: str, device_id: str, count: int):
+        self._total += count
+        self._by_gate[gate] += count
+        self._by_device[device_id] += count
+        self._by_minute[minute] += count
+
+    def seed(self, rows: list[tuple]):
+        """
+        Sets the totals to the checkpointed (minute, gate, device_id, count)
+        rows plus the increments not checkpointed yet. `version` only
+        changes if the totals did.
+        """
+        with self._lock:
+            previous = (self._total, self._by_gate, self._by_device, self._by_minute)
+            self._total = 0
+            self._by_gate, self._by_device, self._by_minute = Counter(), Counter(), Counter()
+            for minute, gate, device_id, count in rows:
+                self._add(_minute(minute), gate, device_id, count)
+            for key, count in self._pending.items():
+                self._add(*key, count)
+            if (self._total, self._by_gate, self._by_device, self._by_minute) != previous:
+                self.version += 1
+
+    def record(self, checkin_time: datetime, gate: str | None, device_id: str | None, count: int = 1):
+        key = (_minute(checkin_time), (gate or "")[:GATE_LENGTH], (device_id or "")[:DEVICE_ID_LENGTH])
+        with self._lock:
+            self._add(*key, count)
+            self._pending[key] += count
+            self.version += 1
+
+    def take_pending(self) -> Counter:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return pending
+
+    def restore_pending(self, pending: Counter):
+        # a failed checkpoint: keep the increments for the next one
+        with self._lock:
+            self._pending.update(pending)
+
+    def snapshot(self, recent_minutes: int = CHECKIN_COUNTER_RECENT_MINUTES) -> CheckInCounters:
+        cutoff = _minute(datetime.now(timezone.utc)) - timedelta(minutes=recent_minutes - 1)
+        with self._lock:
+            return CheckInCounters(
+                event_id=self.event_id,
+                checked_in=self._total,
+                by_gate=dict(self._by_gate),
+                by_device=dict(self._by_device),
+                per_minute=[
+                    {"minute": minute, "count": count}
+                    for minute, count in sorted(self._by_minute.items())
+                    if minute >= cutoff
+                ],
+                version=self.version
+            )
+
+
+class CheckInCounterRegistry:
+    """
+    Counters by event, warmed from checkin_counts on first use and
+    re-seeded from there after each checkpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[UUID, EventCheckInCounters] = {}
+        metrics.register_gauge("scanner.counters.events", lambda: len(self._counters))
+
+    def get(self, event_id: UUID) -> EventCheckInCounters | None:
+        return self._counters.get(event_id)
+
+    def get_or_warm(self, db: Session, event_id: UUID) -> EventCheckInCounters:
+        counters = self.get(event_id)
+        if counters:
+            return counters
+
+        counters = EventCheckInCounters(event_id)
+        counters.seed(CheckInCountRepository.get_for_event(db, event_id))
+        with self._lock:
+            # another thread may have warmed it meanwhile; keep the first
+            return self._counters.setdefault(event_id, counters)
+
+    def record(
+        self,
+        db: Session,
+        event_id: UUID,
+        checkin_time: datetime,
+        gate: str | None = None,
+        device_id: str | None = None
+    ):
+        self.get_or_warm(db, event_id).record(checkin_time, gate, device_id)
+
+    def checkpoint(self) -> int:
+        """
+        Writes all pending increments in one transaction, then re-seeds the
+        warm counters from checkin_counts so they include other workers'
+        check-ins. Returns the number of check-ins checkpointed.
+        """
+        counters = list(self._counters.values())
+        if not counters:
+            return 0
+        taken = [(c, c.take_pending()) for c in counters]
+        rows = [
+            {"event_id": c.event_id, "minute": minute, "gate": gate, "device_id": device_id, "count": count}
+            for c, pending in taken
+            for (minute, gate, device_id), count in pending.items()
+        ]
+
+        with SessionLocal() as db:
+            try:
+                CheckInCountRepository.add(db, rows)
+            except Exception:
+                for c, pending in taken:
+                    c.restore_pending(pending)
+                raise
+            checkpointed_rows = CheckInCountRepository.get_for_events(db, [c.event_id for c in counters])
+        for c in counters:
+            c.seed(checkpointed_rows[c.event_id])
+
+        checkpointed = sum(row["count"] for row in rows)
+        metrics.inc("scanner.counters.checkpointed", checkpointed)
+        return checkpointed
+
+    async def stream(self, event_id: UUID) -> AsyncIterator[str]:
+        """
+        Server-sent events: a `counters` event with the snapshot whenever the
+        counters change (at most every CHECKIN_COUNTER_PUSH_INTERVAL_MS),
+        and a comment line as keep-alive while nothing happens.
+        The event must be warm (get_or_warm) before streaming.
+        """
+        counters = self._counters[event_id]
+        interval = CHECKIN_COUNTER_PUSH_INTERVAL_MS / 1000
+        sent_version = None
+        idle = 0.0
+        metrics.inc("scanner.counters.streams")
+        while True:
+            if counters.version != sent_version:
+                snapshot = counters.snapshot()
+                sent_version = snapshot.version
+                idle = 0.0
+                yield f"event: counters\ndata: {snapshot.model_dump_json()}\n\n"
+            elif idle >= CHECKIN_COUNTER_HEARTBEAT_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(interval)
+            idle += interval
+
+
+checkin_counters = CheckInCounterRegistry()
+
+
+async def run_counter_checkpointer(interval: int = CHECKIN_COUNTER_CHECKPOINT_SECONDS):
+    """
+    Runs checkin_counters.checkpoint every `interval` seconds in a worker thread until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(checkin_counters.checkpoint)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.inc("scanner.counters.checkpoint_failures")
+            logger.exception("Check-in counter checkpoint failed")
@@ -0,0 +1,179 @@
+# index.py
+# In-memory, per-event QR index for the scanner hot path.
+#
+# Each process keeps its own copy, so it can miss what other workers did:
+# the scanner looks codes it does not know up in the DB and adds them, and
+# the unique checkins.registration_id decides duplicates across workers
+# when the writer inserts the row (see writer.py).
+
+import threading
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.modules.events.schema import ScanResult
+from .repository import ScannerRepository
+
+
+class EventScanIndex:
+    """
+    QR code -> registration slot, plus a checked-in bitmap over the slots.
+    A registration can be reached through several codes (registration QR,
+    ticket QR); they all share one slot.
+    """
+
+    def __init__(self, event_id: UUID):
+        self.event_id = event_id
+        self._lock = threading.Lock()
+        self._slot_by_code: dict[str, int] = {}
+        self._codes_by_slot: dict[int, list[str]] = {}
+        self._slot_by_registration: dict[UUID, int] = {}
+        self._registrations: list[UUID] = []
+        self._bitmap = bytearray()
+        # set once a re-warm replaced this index; callers still holding it
+        # are passed on so no scan lands on the stale copy
+        self._replaced_by: "EventScanIndex | None" = None
+
+    def _slot(self, registration_id: UUID) -> int:
+        slot = self._slot_by_registration.get(registration_id)
+        if slot is None:
+            slot = len(self._registrations)
+            self._registrations.append(registration_id)
+            self._slot_by_registration[registration_id] = slot
+            if slot // 8 >= len(self._bitmap):
+                self._bitmap.append(0)
+        return slot
+
+    def add(self, registration_id: UUID, qr_code: str):
+        with self._lock:
+            replaced_by = self._replaced_by
+            if replaced_by is None:
+                slot = self._slot(registration_id)
+                self._slot_by_code[qr_code] = slot
+                self._codes_by_slot.setdefault(slot, []).append(qr_code)
+                return
+        replaced_by.add(registration_id, qr_code)
+
+    def remove(self, registration_id: UUID):
+        """Stops all codes of a registration from scanning (e.g. cancelled)."""
+        with self._lock:
+            replaced_by = self._replaced_by
+            if replaced_by is None:
+                slot = self._slot_by_registration.get(registration_id)
+                for qr_code in self._codes_by_slot.pop(slot, ()):
+                    self._slot_by_code.pop(qr_code, None)
+                return
+        replaced_by.remove(registration_id)
+
+    def mark(self, registration_id: UUID):
+        with self._lock:
+            replaced_by = self._replaced_by
+            if replaced_by is None:
+                self._mark(registration_id)
+                return
+        replaced_by.mark(registration_id)
+
+    def _mark(self, registration_id: UUID):
+        slot = self._slot_by_registration.get(registration_id)
+        if slot is not None:
+            self._bitmap[slot // 8] |= 1 << (slot % 8)
+
+    def _checked_in(self) -> list[UUID]:
+        return [
+            registration_id
+            for slot, registration_id in enumerate(self._registrations)
+            if self._bitmap[slot // 8] & (1 << (slot % 8))
+        ]
+
+    def replace_with(self, index: "EventScanIndex"):
+        """
+        Hands over to a freshly built index: registrations marked here (scans
+        whose check-in rows may still be queued for the writer) stay marked
+        there, and later calls on this index go to the new one.
+        """
+        with self._lock:
+            with index._lock:
+                for registration_id in self._checked_in():
+                    index._mark(registration_id)
+            self._replaced_by = index
+
+    def scan(self, qr_code: str) -> tuple[ScanResult, UUID | None]:
+        """
+        Test-and-set: the first scan of a code is accepted and marks the
+        registration, later scans of any of its codes are duplicates.
+        """
+        with self._lock:
+            replaced_by = self._replaced_by
+            if replaced_by is None:
+                slot = self._slot_by_code.get(qr_code)
+                if slot is None:
+                    return ScanResult.unknown, None
+
+                registration_id = self._registrations[slot]
+                byte, bit = slot // 8, 1 << (slot % 8)
+                if self._bitmap[byte] & bit:
+                    return ScanResult.duplicate, registration_id
+
+                self._bitmap[byte] |= bit
+                return ScanResult.accepted, registration_id
+        return replaced_by.scan(qr_code)
+
+    def __len__(self) -> int:
+        return len(self._registrations)
+
+
+class ScanIndexRegistry:
+    """
+    Warm indexes by event. Updates for events that are not warm are ignored;
+    the index is built from the DB when it is warmed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: dict[UUID, EventScanIndex] = {}
+
+    def get(self, event_id: UUID) -> EventScanIndex | None:
+        return self._indexes.get(event_id)
+
+    def warm(self, db: Session, event_id: UUID) -> EventScanIndex:
+        index = EventScanIndex(event_id)
+        for registration_id, qr_code in ScannerRepository.get_scannable_codes(db, event_id):
+            index.add(registration_id, qr_code)
+        for registration_id in ScannerRepository.get_checked_in(db, event_id):
+            index.mark(registration_id)
+
+        with self._lock:
+            # the DB misses check-ins still queued for the writer: keep the
+            # marks of the index being replaced so those codes stay used
+            previous = self._indexes.get(event_id)
+            if previous is not None:
+                previous.replace_with(index)
+            self._indexes[event_id] = index
+        return index
+
+    def get_or_warm(self, db: Session, event_id: UUID) -> EventScanIndex:
+        return self.get(event_id) or self.warm(db, event_id)
+
+    def drop(self, event_id: UUID):
+        with self._lock:
+            self._indexes.pop(event_id, None)
+
+    def add_code(self, event_id: UUID, registration_id: UUID, qr_code: str):
+        index = self.get(event_id)
+        if index:
+            index.add(registration_id, qr_code)
+
+    def remove_registrations(self, event_id: UUID, registration_ids: list[UUID]):
+        index = self.get(event_id)
+        if index:
+            for registration_id in registration_ids:
+                index.remove(registration_id)
+
+    def mark_checked_in(self, event_id: UUID, registration_ids: list[UUID]):
+        index = self.get(event_id)
+        if index:
+            for registration_id in registration_ids:
+                index.mark(registration_id)
+
+
+scan_indexes = ScanIndexRegistry()
@@ -1,8 +1,26 @@
-from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy import String, DateTime, ForeignKey, Integer, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
+from datetime import datetime
 
 from app.core.database import Base
 
 
+class CheckInCount(Base):
+    """
+    Check-ins per event, minute, gate and device, checkpointed from the
+    in-memory counters (scanners.counters). Missing gate/device is ''.
+    """
+    __tablename__ = "checkin_counts"
+
+    event_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.event_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    minute: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    gate: Mapped[str] = mapped_column(String(50), primary_key=True, default="")
+    device_id: Mapped[str] = mapped_column(String(100), primary_key=True, default="")
+
+    count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
@@ -0,0 +1,121 @@
+# repository.py
+# Queries used to warm the scanner index and the live check-in counters
+from sqlalchemy import select, exists, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.modules.events.models import CheckIn, EventRegistration, RegistrationStatus
+from app.modules.tickets.models import Ticket
+from .models import CheckInCount
+
+
+class ScannerRepository:
+
+    @staticmethod
+    def get_scannable_codes(db: Session, event_id: UUID) -> list[tuple[UUID, str]]:
+        """
+        (registration_id, qr_code) for every non-cancelled registration of the
+        event, plus the QR codes of tickets issued for them.
+        """
+        registrations = (
+            select(EventRegistration.registration_id, EventRegistration.qr_code)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status != RegistrationStatus.cancelled
+            )
+        )
+        tickets = (
+            select(Ticket.registration_id, Ticket.qr_code)
+            .join(EventRegistration, EventRegistration.registration_id == Ticket.registration_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status != RegistrationStatus.cancelled
+            )
+        )
+        return [tuple(row) for row in db.execute(registrations.union_all(tickets)).all()]
+
+    @staticmethod
+    def find_code(db: Session, event_id: UUID, qr_code: str) -> Row | None:
+        """
+        (registration_id, checked_in) for a registration or ticket QR code of
+        the event, or None. For codes the scanner index does not know yet,
+        e.g. registered or issued on another worker; both columns are indexed.
+        """
+        registrations = (
+            select(EventRegistration.registration_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status != RegistrationStatus.cancelled,
+                EventRegistration.qr_code == qr_code
+            )
+        )
+        tickets = (
+            select(Ticket.registration_id)
+            .join(EventRegistration, EventRegistration.registration_id == Ticket.registration_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status != RegistrationStatus.cancelled,
+                Ticket.qr_code == qr_code
+            )
+        )
+        found = registrations.union_all(tickets).subquery()
+        stmt = select(
+            found.c.registration_id,
+            exists().where(CheckIn.registration_id == found.c.registration_id).label("checked_in")
+        ).limit(1)
+        return db.execute(stmt).first()
+
+    @staticmethod
+    def get_checked_in(db: Session, event_id: UUID) -> set[UUID]:
+        stmt = (
+            select(CheckIn.registration_id)
+            .join(EventRegistration, EventRegistration.registration_id == CheckIn.registration_id)
+            .where(EventRegistration.event_id == event_id)
+            .distinct()
+        )
+        return set(db.execute(stmt).scalars().all())
+
+
+class CheckInCountRepository:
+
+    @staticmethod
+    def get_for_event(db: Session, event_id: UUID) -> list[tuple]:
+        """
+        (minute, gate, device_id, count) rows of the event's checkpointed counts.
+        """
+        stmt = (
+            select(CheckInCount.minute, CheckInCount.gate, CheckInCount.device_id, CheckInCount.count)
+            .where(CheckInCount.event_id == event_id)
+        )
+        return [tuple(row) for row in db.execute(stmt).all()]
+
+    @staticmethod
+    def get_for_events(db: Session, event_ids: list[UUID]) -> dict[UUID, list[tuple]]:
+        """
+        get_for_event for several events in one query, by event ID
+        (events without checkpointed counts map to an empty list).
+        """
+        rows = {event_id: [] for event_id in event_ids}
+        stmt = (
+            select(CheckInCount.event_id, CheckInCount.minute, CheckInCount.gate, CheckInCount.device_id, CheckInCount.count)
+            .where(CheckInCount.event_id.in_(event_ids))
+        )
+        for event_id, *row in db.execute(stmt).all():
+            rows[event_id].append(tuple(row))
+        return rows
+
+    @staticmethod
+    def add(db: Session, rows: list[dict]):
+        """
+        Adds count deltas (INSERT ... ON CONFLICT DO UPDATE, executemany).
+        Commits once.
+        """
+        if rows:
+            stmt = pg_insert(CheckInCount)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CheckInCount.event_id, CheckInCount.minute, CheckInCount.gate, CheckInCount.device_id],
+                set_={"count": CheckInCount.count + stmt.excluded.count}
+            )
+            db.execute(stmt, rows)
+        db.commit()
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from uuid import UUID
 from ...core.database import get_db
-from ..users.auth import get_current_user
-from ..events.schema import CheckInCreate
-from .services import CheckInService
+from ..users.auth import get_current_user, get_stream_user
+from .schema import CheckInCreate, CheckInCounters
+from .services import ScannerService
 from ..events.schema import CheckInRead
 
 router = APIRouter(prefix="/scanner", tags=["Scanner"])
@@ -15,9 +17,51 @@ def scan_ticket(payload: CheckInCreate, db: Session = Depends(get_db), current_u
 
     Roles allowed: Admin / Staff / Volunteer
     """
-    return CheckInService.scan_qr(
+    return ScannerService.check_in(
         db=db,
+        event_id=payload.event_id,
         qr_code=payload.qr_code,
+        user_id=current_user.user_id,
         gate=payload.gate,
         device_id=payload.device_id
     )
+
+
+@router.post("/events/{event_id}/warm")
+def warm_event_index(event_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """
+    Preload the event's QR index before doors open.
+
+    Roles allowed: Admin / Staff / Volunteer
+    """
+    indexed = ScannerService.warm(db=db, event_id=event_id, user_id=current_user.user_id)
+    return {"event_id": event_id, "registrations": indexed}
+
+
+@router.get("/events/{event_id}/counters", response_model=CheckInCounters)
+def event_counters(event_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """
+    Live check-in counts: total, per gate, per device and per minute.
+
+    Roles allowed: Admin / Staff / Volunteer
+    """
+    return ScannerService.counters(db=db, event_id=event_id, user_id=current_user.user_id)
+
+
+@router.get("/events/{event_id}/counters/stream")
+def stream_event_counters(
+    event_id: UUID,
+    db: Session = Depends(get_db, scope="function"),
+    current_user=Depends(get_stream_user)
+):
+    """
+    Server-sent events: the counters (same body as /counters) each time they change.
+
+    Roles allowed: Admin / Staff / Volunteer
+    """
+    events = ScannerService.stream_counters(db=db, event_id=event_id, user_id=current_user.user_id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
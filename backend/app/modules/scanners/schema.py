@@ -1,6 +1,23 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from uuid import UUID
+from datetime import datetime
 
 class CheckInCreate(BaseModel):
+    event_id: UUID
     qr_code: str
-    gate: str | None = None
-    device_id: str | None = None
+    gate: str | None = Field(default=None, max_length=50)
+    device_id: str | None = Field(default=None, max_length=100)
+
+
+class MinuteCount(BaseModel):
+    minute: datetime
+    count: int
+
+
+class CheckInCounters(BaseModel):
+    event_id: UUID
+    checked_in: int
+    by_gate: dict[str, int]
+    by_device: dict[str, int]
+    per_minute: list[MinuteCount]
+    version: int
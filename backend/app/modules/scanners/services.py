@@ -1,34 +1,139 @@
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from uuid import UUID
-from datetime import datetime
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
+
+from app.core.metrics import metrics
+
+from app.modules.events.models import CheckIn, OrganiserRole
+from app.modules.events.activity import activity_hub
+from app.modules.events.schema import CheckInRead, ScanResult
+from app.modules.events.services import RBACService
+from .counters import checkin_counters
+from .index import scan_indexes
+from .repository import ScannerRepository
+from .schema import CheckInCounters
+from .writer import checkin_writer
+
+# how long a scan waits for the writer to confirm its check-in row
+SCANNER_CONFIRM_SECONDS = float(os.getenv("SCANNER_CONFIRM_SECONDS", 2))
+
+SCANNER_ROLES = [
+    OrganiserRole.admin,
+    OrganiserRole.staff,
+    OrganiserRole.volunteer
+]
 
-from app.modules.events.models import CheckIn, EventRegistration
 
 class ScannerService:
 
+    @staticmethod
+    def warm(db: Session, event_id: UUID, user_id: UUID) -> int:
+        """
+        Build (or rebuild) the event's QR index, e.g. when doors open.
+        Returns the number of registrations indexed.
+        """
+        RBACService.require_roles(db, user_id, event_id, allowed_roles=SCANNER_ROLES)
+        return len(scan_indexes.warm(db, event_id))
+
     @staticmethod
     def check_in(
         db: Session,
-        registration_id: UUID,
+        event_id: UUID,
+        qr_code: str,
+        user_id: UUID,
         gate: str | None = None,
         device_id: str | None = None
-    ):
-        registration = db.get(EventRegistration, registration_id)
+    ) -> CheckIn:
+        """
+        Resolve a scanned QR code against the in-memory index and queue the
+        check-in row for the background writer, which the DB confirms (or
+        reports a check-in made on another worker) within a batch.
+        The index is warmed from the DB on the first scan of an event; codes
+        it does not know are looked up in the DB and added.
+        """
+        RBACService.require_roles(db, user_id, event_id, allowed_roles=SCANNER_ROLES)
 
-        if not registration:
-            raise ValueError("Invalid registration")
+        index = scan_indexes.get_or_warm(db, event_id)
+        result, registration_id = index.scan(qr_code)
 
-        if registration.checkins:
-            raise ValueError("Already checked in")
+        if result == ScanResult.unknown:
+            # registered or issued on another worker, or after the warm-up
+            metrics.inc("scanner.index_misses")
+            found = ScannerRepository.find_code(db, event_id, qr_code)
+            if found:
+                index.add(found.registration_id, qr_code)
+                if found.checked_in:
+                    index.mark(found.registration_id)
+                result, registration_id = index.scan(qr_code)
+
+        if result == ScanResult.unknown:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invalid registration"
+            )
+
+        if result == ScanResult.duplicate:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Already checked in"
+            )
 
         checkin = CheckIn(
+            checkin_id=uuid4(),
             registration_id=registration_id,
+            checkin_time=datetime.now(timezone.utc),
             gate=gate,
             device_id=device_id
         )
+        written = checkin_writer.submit({
+            "checkin_id": checkin.checkin_id,
+            "registration_id": checkin.registration_id,
+            "checkin_time": checkin.checkin_time,
+            "gate": checkin.gate,
+            "device_id": checkin.device_id
+        })
+        try:
+            inserted = written.result(timeout=SCANNER_CONFIRM_SECONDS)
+        except FutureTimeoutError:
+            # DB slow or down: accept on the index, the writer keeps the row
+            metrics.inc("scanner.unconfirmed")
+            inserted = True
+        except DBAPIError:
+            # rejected, e.g. the registration was deleted meanwhile
+            index.remove(registration_id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invalid registration"
+            )
+        if not inserted:
+            # checked in on another worker
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Already checked in"
+            )
 
-        db.add(checkin)
-        db.commit()
-        db.refresh(checkin)
+        checkin_counters.record(db, event_id, checkin.checkin_time, gate, device_id)
+        activity_hub.publish(None, event_id, "checkin", checkin, CheckInRead)
 
         return checkin
+
+    @staticmethod
+    def counters(db: Session, event_id: UUID, user_id: UUID) -> CheckInCounters:
+        """
+        Live check-in counts from memory (warmed from the last checkpoint).
+        """
+        RBACService.require_roles(db, user_id, event_id, allowed_roles=SCANNER_ROLES)
+        return checkin_counters.get_or_warm(db, event_id).snapshot()
+
+    @staticmethod
+    def stream_counters(db: Session, event_id: UUID, user_id: UUID):
+        """
+        Access check and warm-up for the SSE stream; returns the event iterator.
+        """
+        RBACService.require_roles(db, user_id, event_id, allowed_roles=SCANNER_ROLES)
+        checkin_counters.get_or_warm(db, event_id)
+        return checkin_counters.stream(event_id)
@@ -0,0 +1,151 @@
+# writer.py
+# Persists scanner check-ins off the request path, in batches.
+#
+# The insert skips registrations that are already checked in (the unique
+# checkins.registration_id), so the DB decides duplicates across workers;
+# submit() returns a future that tells the scanner which way it went.
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.modules.events.repository import CheckInRepository
+
+logger = logging.getLogger(__name__)
+
+# first retry delay after a failed write; doubles up to CHECKIN_WRITER_MAX_RETRY_SECONDS
+CHECKIN_WRITER_RETRY_SECONDS = float(os.getenv("CHECKIN_WRITER_RETRY_SECONDS", 0.5))
+CHECKIN_WRITER_MAX_RETRY_SECONDS = float(os.getenv("CHECKIN_WRITER_MAX_RETRY_SECONDS", 30))
+# how long shutdown waits for queued check-ins to be written
+CHECKIN_WRITER_SHUTDOWN_SECONDS = int(os.getenv("CHECKIN_WRITER_SHUTDOWN_SECONDS", 30))
+
+
+class CheckInWriter:
+    """
+    Background thread that drains queued check-in rows and writes them with
+    one multi-row INSERT per batch. Started on first use.
+    A batch is whatever arrives within `flush_interval` of its first row.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.02):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[tuple[dict, Future]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        metrics.register_gauge("scanner.writer.queued", self._queue.qsize)
+
+    def submit(self, row: dict) -> Future:
+        """
+        Queues the row. The future resolves to True once it is written, False
+        if the registration was already checked in, or to the DB error if
+        the row was rejected.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="checkin-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> list[tuple[dict, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _transient(exc: DBAPIError) -> bool:
+        # lost connection, DB restarting, timeouts: worth retrying as is
+        return exc.connection_invalidated or isinstance(exc, (OperationalError, InterfaceError))
+
+    def _write(self, batch: list[tuple[dict, Future]]):
+        """
+        Writes the batch, retrying with backoff until the DB takes it: an
+        accepted scan must not be lost to a dropped connection or a restart
+        of the DB. Rows the DB rejects (registration deleted meanwhile, a
+        value that does not fit its column) can never succeed; they are
+        split out and dropped one by one so the rest of the batch still
+        lands and the writer does not stall behind them.
+        """
+        delay = CHECKIN_WRITER_RETRY_SECONDS
+        while True:
+            db = SessionLocal()
+            try:
+                inserted = CheckInRepository.bulk_create(db, [row for row, _ in batch])
+                metrics.inc("scanner.writer.rows", len(inserted))
+                metrics.inc("scanner.writer.duplicates", len(batch) - len(inserted))
+                for row, future in batch:
+                    future.set_result(row["registration_id"] in inserted)
+                return
+            except DBAPIError as exc:
+                db.rollback()
+                if not self._transient(exc):
+                    self._split(batch, exc)
+                    return
+                metrics.inc("scanner.writer.retries")
+                logger.exception("Failed to persist %d check-ins; retrying in %.1fs", len(batch), delay)
+            except Exception:
+                db.rollback()
+                metrics.inc("scanner.writer.retries")
+                logger.exception("Failed to persist %d check-ins; retrying in %.1fs", len(batch), delay)
+            finally:
+                db.close()
+            time.sleep(delay)
+            delay = min(delay * 2, CHECKIN_WRITER_MAX_RETRY_SECONDS)
+
+    def _split(self, batch: list[tuple[dict, Future]], exc: DBAPIError):
+        """Retries a rejected batch row by row, dropping the rows that fail."""
+        if len(batch) == 1:
+            row, future = batch[0]
+            metrics.inc("scanner.writer.rejected_rows")
+            logger.exception("Dropping check-in rejected by the DB: %s", row)
+            future.set_exception(exc)
+            return
+        for item in batch:
+            self._write([item])
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until everything queued so far has been written, or `timeout`
+        seconds have passed. Returns False if rows are still queued.
+        """
+        if not (self._thread and self._thread.is_alive()):
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self, timeout: float = CHECKIN_WRITER_SHUTDOWN_SECONDS):
+        """Flush on shutdown; rows the DB has not taken by then are lost."""
+        if not self.flush(timeout):
+            metrics.inc("scanner.writer.lost_rows", self._queue.unfinished_tasks)
+            logger.error("Shutting down with %d check-ins not persisted", self._queue.unfinished_tasks)
+
+
+checkin_writer = CheckInWriter()
@@ -0,0 +1,152 @@
+# issuance.py
+# Bulk ticket issuance for a whole event.
+#
+# The job only ever looks at confirmed registrations without a ticket and
+# inserts with ON CONFLICT DO NOTHING, so it is idempotent and resuming is
+# just running it again.
+#
+# Jobs are rows in ticket_issuance_jobs, so progress can be polled on any
+# worker. Creating a job and running it take per-event advisory locks: one
+# active job per event across all workers, and a job whose worker died is
+# replaced the next time issuance is requested.
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from uuid import UUID, uuid4
+
+from sqlalchemy.orm import Session
+
+from ...core.database import SessionLocal, engine
+from ...core.metrics import metrics
+from ..scanners.index import scan_indexes
+from .models import TicketIssuanceJob
+from .repository import IssuanceJobRepository, TicketRepository
+from .services import TicketService
+
+logger = logging.getLogger(__name__)
+
+ISSUANCE_BATCH_SIZE = 1000
+# a job still queued after this long never started (its worker went away)
+ISSUANCE_QUEUED_TIMEOUT_SECONDS = int(os.getenv("ISSUANCE_QUEUED_TIMEOUT_SECONDS", 60))
+
+
+def _abandoned(db: Session, job: TicketIssuanceJob) -> bool:
+    """
+    True for an active job nobody is running: no worker holds the event's
+    run lock and it is running, or has been queued for too long.
+    """
+    if job.status == "queued":
+        age = datetime.now(timezone.utc) - job.created_at
+        if age < timedelta(seconds=ISSUANCE_QUEUED_TIMEOUT_SECONDS):
+            return False
+    conn = db.connection()
+    if not IssuanceJobRepository.try_lock_run(conn, job.event_id):
+        return False
+    IssuanceJobRepository.unlock_run(conn, job.event_id)
+    return True
+
+
+def create_job(db: Session, event_id: UUID) -> tuple[TicketIssuanceJob, bool]:
+    """
+    New job for the event, or the one already queued/running on any worker.
+    The flag tells whether the job was created by this call.
+    """
+    IssuanceJobRepository.lock_creation(db, event_id)
+    job = IssuanceJobRepository.get_active(db, event_id)
+    if job is not None:
+        if not _abandoned(db, job):
+            db.commit()
+            return job, False
+        job.status = "failed"
+        job.error = "Interrupted"
+        job.finished_at = datetime.now(timezone.utc)
+    return IssuanceJobRepository.create(db, event_id), True
+
+
+def run_issuance(job_id: UUID, batch_size: int = ISSUANCE_BATCH_SIZE):
+    """
+    Issue tickets for every pending registration of the job's event in
+    batches, recording progress on the job row. Runs in a background thread
+    with its own session, holding the event's run lock on a separate
+    connection for the whole job.
+    """
+    db = SessionLocal()
+    lock_conn = engine.connect()
+    locked = False
+    job = None
+    started = perf_counter()
+    try:
+        job = IssuanceJobRepository.get(db, job_id)
+        if job is None or job.status != "queued":
+            return
+        event_id = job.event_id
+
+        locked = IssuanceJobRepository.try_lock_run(lock_conn, event_id)
+        lock_conn.commit()  # the lock is session-level; do not sit idle in a transaction
+        if not locked:
+            job.status = "failed"
+            job.error = "Another issuance job is running for this event"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        job.total = TicketRepository.count_pending_issuance(db, event_id)
+        db.commit()
+
+        after = None
+        while True:
+            registration_ids = TicketRepository.get_pending_issuance(
+                db, event_id, limit=batch_size, after=after
+            )
+            if not registration_ids:
+                break
+
+            rows = [
+                {
+                    "ticket_id": uuid4(),
+                    "registration_id": registration_id,
+                    "qr_code": TicketService.make_qr_payload(registration_id)
+                }
+                for registration_id in registration_ids
+            ]
+            # rows skipped by ON CONFLICT (issued meanwhile) are not counted
+            inserted = TicketRepository.bulk_create(db, rows)
+
+            for ticket in inserted:
+                scan_indexes.add_code(event_id, ticket.registration_id, ticket.qr_code)
+
+            after = registration_ids[-1]
+            job.issued += len(inserted)
+            job.elapsed_seconds = perf_counter() - started
+            db.commit()
+            metrics.inc("tickets.bulk_issued", len(inserted))
+
+        job.status = "completed"
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Ticket issuance job %s failed", job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = str(exc)
+    finally:
+        if locked:
+            job.elapsed_seconds = perf_counter() - started
+            job.finished_at = datetime.now(timezone.utc)
+        try:
+            if db.dirty:
+                db.commit()
+        except Exception:
+            logger.exception("Could not record the end of ticket issuance job %s", job_id)
+        if locked:
+            try:
+                IssuanceJobRepository.unlock_run(lock_conn, event_id)
+                lock_conn.commit()
+            except Exception:
+                # closing the connection below drops the lock as well
+                logger.exception("Could not release the issuance lock of job %s", job_id)
+        lock_conn.close()
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Float, Text, func
 from sqlalchemy.orm import Mapped, DeclarativeBase, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -12,6 +12,7 @@ class Ticket(Base):
     registration_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True), 
         ForeignKey("event_registrations.registration_id", ondelete="CASCADE"),
+        unique=True,  # one ticket per registration; makes bulk issuance idempotent
         nullable=False
     )
     qr_code: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
@@ -23,3 +24,34 @@ class Ticket(Base):
 
     # relationships
     registration = relationship("EventRegistration", back_populates="ticket")
+
+
+class TicketIssuanceJob(Base):
+    """
+    A bulk issuance run for an event (tickets/issuance.py). Kept in the DB so
+    any worker can report its progress and see that one is already running.
+    """
+    __tablename__ = "ticket_issuance_jobs"
+
+    job_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    event_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.event_id", ondelete="CASCADE"),
+        index=True,
+        nullable=False
+    )
+    status: Mapped[str] = mapped_column(String(20), default="queued", nullable=False)  # queued | running | completed | failed
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    issued: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    elapsed_seconds: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    @property
+    def tickets_per_sec(self) -> float:
+        return self.issued / self.elapsed_seconds if self.elapsed_seconds else 0.0
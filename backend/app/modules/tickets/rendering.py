@@ -0,0 +1,101 @@
+# rendering.py
+# QR image rendering for tickets, off the request threads.
+#
+# Images are a pure function of (payload, format), so they are cached by a
+# hash of both and the same hash doubles as the HTTP ETag.
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ...core.cache import TTLCache
+from ...core.metrics import metrics
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+TICKET_RENDER_WORKERS = int(os.getenv("TICKET_RENDER_WORKERS", 2))
+
+
+def render_qr(payload: str, fmt: str = "png") -> bytes:
+    """
+    Render one QR code. Runs inside a worker process, so qrcode/PIL are
+    only imported there.
+    """
+    import io
+    import qrcode
+
+    buffer = io.BytesIO()
+    if fmt == "svg":
+        from qrcode.image.svg import SvgPathImage
+        qrcode.make(payload, image_factory=SvgPathImage).save(buffer)
+    else:
+        qrcode.make(payload).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def content_key(payload: str, fmt: str) -> str:
+    return hashlib.sha256(f"{fmt}:{payload}".encode()).hexdigest()
+
+
+class QRRenderer:
+    """
+    Process-pool backed renderer with a content-addressed image cache.
+    The pool is created on first use.
+    """
+
+    def __init__(self, workers: int, cache: TTLCache):
+        self.workers = workers
+        self.cache = cache
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def render(self, payload: str, fmt: str = "png") -> bytes:
+        key = content_key(payload, fmt)
+        image = self.cache.get(key)
+        if image is None:
+            loop = asyncio.get_running_loop()
+            with metrics.timer("tickets.qr_render"):
+                image = await loop.run_in_executor(self._executor(), render_qr, payload, fmt)
+            self.cache.set(key, image)
+        return image
+
+    def render_many(self, payloads: list[str], fmt: str = "png") -> int:
+        """
+        Blocking bulk render (pre-render before doors open).
+        Payloads are shipped to the workers in chunks to keep IPC overhead low.
+        Returns the number of images rendered (cache hits are skipped).
+        """
+        missing = [p for p in payloads if self.cache.get(content_key(p, fmt)) is None]
+        if not missing:
+            return 0
+
+        chunksize = max(1, len(missing) // (self.workers * 4))
+        images = self._executor().map(render_qr, missing, [fmt] * len(missing), chunksize=chunksize)
+        for payload, image in zip(missing, images):
+            self.cache.set(content_key(payload, fmt), image)
+
+        metrics.inc("tickets.qr_prerendered", len(missing))
+        return len(missing)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+qr_renderer = QRRenderer(
+    workers=TICKET_RENDER_WORKERS,
+    cache=TTLCache(
+        "qr_images",
+        maxsize=int(os.getenv("QR_CACHE_SIZE", 20000)),
+        ttl=int(os.getenv("QR_CACHE_TTL_SECONDS", 24 * 3600))
+    )
+)
@@ -0,0 +1,157 @@
+# repository.py
+# it contains ONLY database operations
+from sqlalchemy import select, func, and_, Connection, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from .models import Ticket, TicketIssuanceJob
+from ..events.models import EventRegistration, EventOrganiser, RegistrationStatus
+
+# pg advisory lock classes for bulk issuance, keyed by event:
+# creating a job (transaction-level) and running one (session-level)
+ISSUANCE_CREATE_LOCK_ID = 2302
+ISSUANCE_RUN_LOCK_ID = 2303
+
+
+class TicketRepository:
+
+    @staticmethod
+    def get_qr_codes_for_event(db: Session, event_id: UUID) -> list[str]:
+        stmt = (
+            select(Ticket.qr_code)
+            .join(EventRegistration, EventRegistration.registration_id == Ticket.registration_id)
+            .where(EventRegistration.event_id == event_id)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def pending_issuance_query(event_id: UUID):
+        """
+        Confirmed registrations of the event that have no ticket yet.
+        """
+        return (
+            select(EventRegistration.registration_id)
+            .outerjoin(Ticket, Ticket.registration_id == EventRegistration.registration_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status == RegistrationStatus.confirmed,
+                Ticket.ticket_id.is_(None)
+            )
+        )
+
+    @staticmethod
+    def count_pending_issuance(db: Session, event_id: UUID) -> int:
+        stmt = select(func.count()).select_from(
+            TicketRepository.pending_issuance_query(event_id).subquery()
+        )
+        return db.execute(stmt).scalar_one()
+
+    @staticmethod
+    def get_pending_issuance(
+        db: Session,
+        event_id: UUID,
+        limit: int,
+        after: UUID | None = None
+    ) -> list[UUID]:
+        stmt = TicketRepository.pending_issuance_query(event_id)
+        if after:
+            stmt = stmt.where(EventRegistration.registration_id > after)
+        stmt = stmt.order_by(EventRegistration.registration_id).limit(limit)
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def bulk_create(db: Session, rows: list[dict]) -> list[Row]:
+        """
+        executemany INSERT ... ON CONFLICT (registration_id) DO NOTHING,
+        so re-running a batch never issues a second ticket. Commits once.
+        Returns (registration_id, qr_code) of the tickets actually inserted.
+        """
+        inserted = []
+        if rows:
+            stmt = (
+                pg_insert(Ticket)
+                .on_conflict_do_nothing(index_elements=[Ticket.registration_id])
+                .returning(Ticket.registration_id, Ticket.qr_code)
+            )
+            inserted = list(db.execute(stmt, rows).all())
+        db.commit()
+        return inserted
+
+
+class IssuanceJobRepository:
+
+    @staticmethod
+    def _lock_key(event_id: UUID):
+        return func.hashtext(str(event_id))
+
+    @staticmethod
+    def get(db: Session, job_id: UUID) -> TicketIssuanceJob | None:
+        return db.get(TicketIssuanceJob, job_id)
+
+    @staticmethod
+    def get_active(db: Session, event_id: UUID) -> TicketIssuanceJob | None:
+        """The event's latest queued or running job."""
+        stmt = (
+            select(TicketIssuanceJob)
+            .where(
+                TicketIssuanceJob.event_id == event_id,
+                TicketIssuanceJob.status.in_(("queued", "running"))
+            )
+            .order_by(TicketIssuanceJob.created_at.desc())
+            .limit(1)
+        )
+        return db.execute(stmt).scalars().first()
+
+    @staticmethod
+    def create(db: Session, event_id: UUID) -> TicketIssuanceJob:
+        job = TicketIssuanceJob(event_id=event_id)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def lock_creation(db: Session, event_id: UUID):
+        """
+        Transaction-level advisory lock: one worker at a time checks for an
+        active job and creates one. Released on commit.
+        """
+        key = IssuanceJobRepository._lock_key(event_id)
+        db.execute(select(func.pg_advisory_xact_lock(ISSUANCE_CREATE_LOCK_ID, key)))
+
+    @staticmethod
+    def try_lock_run(conn: Connection, event_id: UUID) -> bool:
+        """
+        Session-level advisory lock held by the connection while a job runs,
+        so only one job per event runs at a time across workers.
+        """
+        key = IssuanceJobRepository._lock_key(event_id)
+        return conn.execute(select(func.pg_try_advisory_lock(ISSUANCE_RUN_LOCK_ID, key))).scalar_one()
+
+    @staticmethod
+    def unlock_run(conn: Connection, event_id: UUID):
+        key = IssuanceJobRepository._lock_key(event_id)
+        conn.execute(select(func.pg_advisory_unlock(ISSUANCE_RUN_LOCK_ID, key)))
+
+
+class AsyncTicketRepository:
+
+    @staticmethod
+    async def get_qr_access(db: AsyncSession, ticket_id: UUID, user_id: UUID) -> Row | None:
+        """
+        The ticket's QR code with what access checks need, in one query:
+        the registration's owner and `user_id`'s organiser role for the
+        event (None if not an organiser).
+        """
+        stmt = (
+            select(Ticket.qr_code, EventRegistration.user_id.label("owner_id"), EventOrganiser.role)
+            .join(EventRegistration, EventRegistration.registration_id == Ticket.registration_id)
+            .outerjoin(EventOrganiser, and_(
+                EventOrganiser.event_id == EventRegistration.event_id,
+                EventOrganiser.user_id == user_id
+            ))
+            .where(Ticket.ticket_id == ticket_id)
+        )
+        return (await db.execute(stmt)).first()
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
 from uuid import UUID
 
-from ...core.database import get_db
+from ...core.database import get_db, get_async_db
 from ..users.auth import get_current_user
 from .services import TicketService
-from .schema import TicketRead
+from .schema import TicketRead, TicketIssuanceJobRead
+from .rendering import qr_renderer, content_key, MEDIA_TYPES
+from .issuance import create_job, run_issuance
+from .repository import IssuanceJobRepository
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
@@ -17,3 +22,85 @@ def issue_ticket(registration_id: UUID, db: Session = Depends(get_db), current_u
     - Only paid registrations can get a ticket
     """
     return TicketService.generate_ticket(db=db, registration_id=str(registration_id))
+
+
+@router.get("/{ticket_id}/qr")
+async def get_ticket_qr(
+    ticket_id: UUID,
+    format: Literal["png", "svg"] = "png",
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    QR image for a ticket (PNG or SVG).
+
+    - Only for the attendee who registered, or the event's Admin/Staff
+    - Rendered in a worker process, cached by content
+    - Supports ETag / If-None-Match
+    """
+    payload = await TicketService.get_qr_payload(db, ticket_id, current_user.user_id)
+    etag = f'"{content_key(payload, format)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image = await qr_renderer.render(payload, format)
+    return Response(content=image, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.post("/events/{event_id}/prerender", status_code=status.HTTP_202_ACCEPTED)
+def prerender_event_tickets(
+    event_id: UUID,
+    background_tasks: BackgroundTasks,
+    format: Literal["png", "svg"] = "png",
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Render every ticket QR of an event into the cache in the background,
+    e.g. before doors open. (Admin/Staff)
+    """
+    payloads = TicketService.get_event_qr_payloads(db, event_id, current_user.user_id)
+    background_tasks.add_task(qr_renderer.render_many, payloads, format)
+    return {"event_id": event_id, "tickets": len(payloads)}
+
+
+@router.post(
+    "/events/{event_id}/issue",
+    response_model=TicketIssuanceJobRead,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def issue_event_tickets(
+    event_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Issue tickets for every confirmed registration of an event that has none yet.
+
+    - Runs in the background; poll GET /tickets/jobs/{job_id} for progress
+    - Safe to re-run: already issued registrations are skipped
+    - Admin/Staff only
+    """
+    TicketService.require_ticket_manager(db, event_id, current_user.user_id)
+    job, created = create_job(db, event_id)
+    if created:
+        background_tasks.add_task(run_issuance, job.job_id)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=TicketIssuanceJobRead)
+def get_issuance_job(job_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """
+    Progress and throughput of a bulk issuance job.
+
+    - Admin/Staff of the job's event only
+    """
+    job = IssuanceJobRepository.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    TicketService.require_ticket_manager(db, job.event_id, current_user.user_id)
+    return job
@@ -14,3 +14,17 @@ class TicketRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+class TicketIssuanceJobRead(BaseModel):
+    job_id: UUID
+    event_id: UUID
+    status: str
+    total: int
+    issued: int
+    tickets_per_sec: float
+    started_at: datetime | None
+    finished_at: datetime | None
+    error: str | None
+
+    class Config:
+        from_attributes = True
@@ -1,31 +1,38 @@
-import qrcode
-import io
 from uuid import UUID, uuid4
-import base64
 from datetime import datetime
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Ticket
-from ..events.models import EventRegistration
+from .repository import TicketRepository, AsyncTicketRepository
+from ..events.models import EventRegistration, OrganiserRole, RegistrationStatus
+from ..events.services import RBACService
+from ..scanners.index import scan_indexes
+
+TICKET_MANAGER_ROLES = [
+    OrganiserRole.admin,
+    OrganiserRole.staff
+]
+
 
 class TicketService:
 
+    @staticmethod
+    def make_qr_payload(registration_id: UUID) -> str:
+        return f"{registration_id}-{uuid4()}"
+
     @staticmethod
     def generate_ticket(db: Session, registration_id: str) -> Ticket:
         # Check if registration exists and is paid
         registration = db.query(EventRegistration).filter_by(registration_id=registration_id).first()
         if not registration:
             raise ValueError("Registration not found")
-        if registration.status != "confirmed":
+        if registration.status != RegistrationStatus.confirmed:
             raise ValueError("Payment not completed. Ticket cannot be issued.")
 
         # Generate unique QR code (could be UUID or hash)
-        qr_data = f"{registration.registration_id}-{uuid4()}"
-        qr_img = qrcode.make(qr_data)
-
-        # Save QR code as base64 (for API response)
-        buffer = io.BytesIO()
-        qr_img.save(buffer, format="PNG")
-        qr_b64 = base64.b64encode(buffer.getvalue()).decode()
+        # the image itself is rendered on demand by GET /tickets/{ticket_id}/qr
+        qr_data = TicketService.make_qr_payload(registration.registration_id)
 
         # Save ticket in DB
         ticket = Ticket(
@@ -36,5 +43,42 @@ class TicketService:
         db.add(ticket)
         db.commit()
         db.refresh(ticket)
+        scan_indexes.add_code(registration.event_id, ticket.registration_id, ticket.qr_code)
 
         return ticket
+
+    @staticmethod
+    async def get_qr_payload(db: AsyncSession, ticket_id: UUID, user_id: UUID) -> str:
+        """
+        QR payload of a ticket, for the attendee who registered or the
+        event's Admin/Staff.
+        """
+        ticket = await AsyncTicketRepository.get_qr_access(db, ticket_id, user_id)
+        if ticket is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ticket not found"
+            )
+        if ticket.owner_id != user_id and ticket.role not in TICKET_MANAGER_ROLES:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized"
+            )
+        return ticket.qr_code
+
+    @staticmethod
+    def require_ticket_manager(db: Session, event_id: UUID, user_id: UUID):
+        RBACService.require_roles(
+            db,
+            user_id,
+            event_id,
+            allowed_roles=TICKET_MANAGER_ROLES
+        )
+
+    @staticmethod
+    def get_event_qr_payloads(db: Session, event_id: UUID, user_id: UUID) -> list[str]:
+        """
+        QR payloads of every ticket issued for the event (Admin/Staff).
+        """
+        TicketService.require_ticket_manager(db, event_id, user_id)
+        return TicketRepository.get_qr_codes_for_event(db, event_id)
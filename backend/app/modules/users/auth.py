@@ -292,18 +292,23 @@
 
 # auth.py
 
+import os
 import secrets
+from dataclasses import dataclass
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import jwt, JWTError, ExpiredSignatureError
 from uuid import UUID
 from typing import Dict
 
 from . import schema, repository
-from ...core.database import get_db
-from .services import verify_password, hash_password, create_refresh_token
+from ...core.database import get_db, get_async_db
+from ...core.cache import TTLCache
+from .services import verify_and_update_async, hash_password, create_refresh_token, parse_refresh_token
+from .revocation import revoked_refresh_tokens
 from .models import User
 from .schema import RefreshTokenRequest
 from . import repository as repo
@@ -338,12 +343,39 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
+# -------------------------------------------------------------------
+# PRINCIPAL CACHE
+# -------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    What most handlers need from the logged-in user.
+    Cached per process so authenticated requests skip the users table.
+    """
+    user_id: UUID
+    username: str
+    role: str
+
+
+# keyed by the token "sub"; entries are dropped on profile/password changes
+principal_cache = TTLCache(
+    "principals",
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000)),
+    ttl=int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+)
+
+
+def invalidate_principal(user_id: UUID):
+    principal_cache.pop(str(user_id))
+
+
 # -------------------------------------------------------------------
 # DECODE TOKEN & GET CURRENT USER
 # -------------------------------------------------------------------
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
     """
-    Verifies JWT, extracts "sub" (user ID), fetches user from DB, and returns it.
+    Verifies JWT, extracts "sub" (user ID) and returns the user's Principal.
+    The DB is only hit when the principal is not cached.
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -357,6 +389,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    principal = principal_cache.get(user_id)
+    if principal:
+        return principal
+
     # Validate UUID format
     try:
         user_uuid = UUID(user_id)
@@ -368,6 +404,34 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    principal = Principal(user_id=user.user_id, username=user.username, role=user.role)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def get_stream_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db, scope="function")
+) -> Principal:
+    """
+    get_current_user for streaming routes. Its session (shared with the
+    route's own `Depends(get_db, scope="function")`) is closed when the
+    route returns, not when the stream ends, so an open stream does not
+    hold a pooled connection.
+    """
+    return get_current_user(token, db)
+
+
+def get_current_user_record(
+    principal: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Full User row for handlers that read or modify the profile itself.
+    """
+    user = db.get(User, principal.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
@@ -394,24 +458,35 @@ def register_user(user: schema.UserRegister, db: Session = Depends(get_db)):
 # LOGIN USER → RETURNS ACCESS + REFRESH TOKEN
 # -------------------------------------------------------------------
 @router.post("/login", response_model=schema.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Login using username or email.
     Returns:
       - access_token (JWT)
       - refresh_token (stored in DB)
+
+    Async: the Argon2 check is awaited from the hashing pool, so a login
+    storm does not tie up threadpool threads other routes need.
     """
-    user = repository.get_user_by_username_or_email(db, form_data.username)
+    user = await repository.get_user_by_username_or_email_async(db, form_data.username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = await verify_and_update_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # Argon2 parameters changed since this hash was made: store the upgraded
+    # hash (committed together with the refresh token below)
+    if new_hash:
+        user.hashed_password = new_hash
+
     # Create JWT with "sub"
     access_token = create_access_token({"sub": str(user.user_id)})
 
-    # Create & save refresh token
-    refresh_token_str, refresh_expires = create_refresh_token()
-    repo.save_refresh_token(db, user.user_id, refresh_token_str)
+    # Create & save refresh token (only its hash is stored)
+    refresh_id, refresh_token_str, refresh_expires = create_refresh_token(user.user_id)
+    await repo.save_refresh_token_async(db, refresh_id, user.user_id, refresh_token_str, refresh_expires)
 
     return schema.Token(
         access_token=access_token,
@@ -425,19 +500,22 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 # REFRESH TOKEN → NEW ACCESS TOKEN
 # -------------------------------------------------------------------
 @router.post("/refresh", response_model=Dict[str, str])
-def refresh(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+def refresh(payload: RefreshTokenRequest):
     """
     Accepts a refresh token → returns new access token.
+    Validated from its signature and the in-process revocation set,
+    so the DB is only read by the periodic revocation sync.
     """
     token_str = payload.refresh_token
     if not token_str:
         raise HTTPException(400, "refresh_token required")
 
-    rt = repo.get_refresh_token(db, token_str)
-    if not rt or rt.revoked:
+    parsed = parse_refresh_token(token_str)
+    if not parsed or revoked_refresh_tokens.is_revoked(parsed[0]):
         raise HTTPException(401, "Invalid refresh token")
 
-    new_access = create_access_token({"sub": str(rt.user_id)})
+    token_id, user_id = parsed
+    new_access = create_access_token({"sub": str(user_id)})
 
     return {"access_token": new_access, "token_type": "bearer"}
 
@@ -454,9 +532,10 @@ def logout(payload: Dict[str, str], db: Session = Depends(get_db)):
     if not token_str:
         raise HTTPException(400, "refresh_token required")
 
-    rt = repo.revoke_refresh_token(db, token_str)
-    if not rt:
+    token_id = repo.revoke_refresh_token(db, token_str)
+    if not token_id:
         raise HTTPException(404, "Token not found")
+    revoked_refresh_tokens.add([token_id])
 
     return {"detail": "Logged out successfully"}
 
@@ -465,7 +544,7 @@ def logout(payload: Dict[str, str], db: Session = Depends(get_db)):
 # GET CURRENT USER INFO
 # -------------------------------------------------------------------
 @router.get("/me", response_model=schema.UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: User = Depends(get_current_user_record)):
     """
     Returns logged-in user's profile.
     """
@@ -476,7 +555,7 @@ def get_me(current_user: User = Depends(get_current_user)):
 # UPDATE PROFILE (PARTIAL UPDATE)
 # -------------------------------------------------------------------
 @router.patch("/me", response_model=schema.UserResponse)
-def update_profile(payload: schema.UserUpdate, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+def update_profile(payload: schema.UserUpdate, current_user=Depends(get_current_user_record), db: Session = Depends(get_db)):
     """
     Update username, email, or role of the logged-in user.
     """
@@ -498,6 +577,7 @@ def update_profile(payload: schema.UserUpdate, current_user=Depends(get_current_
         db.add(current_user)
         db.commit()
         db.refresh(current_user)
+        invalidate_principal(current_user.user_id)
 
     return current_user
 
@@ -571,5 +651,9 @@ def password_reset_confirm(payload: Dict[str, str], db: Session = Depends(get_db
     # Mark token used
     repo.mark_password_reset_used(db, token_obj)
     db.commit()
+    invalidate_principal(user.user_id)
+
+    # sign the user out everywhere (one UPDATE)
+    revoked_refresh_tokens.add(repo.revoke_user_refresh_tokens(db, user.user_id))
 
     return {"detail": "Password updated successfully"}
@@ -1,5 +1,5 @@
 # User models.py
-from sqlalchemy import String, DateTime, func, Boolean, ForeignKey
+from sqlalchemy import String, DateTime, func, Boolean, ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -63,16 +63,24 @@ class User(Base):
         return f"User(id={self.user_id}, username='{self.username}', role='{self.role}')"
     
 
+# case-insensitive login lookup (see repository.get_user_by_username_or_email)
+Index("ix_users_email_lower", func.lower(User.email))
+Index("ix_users_username_lower", func.lower(User.username))
+
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
     id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    token: Mapped[str] = mapped_column(String, unique=True, index=True)
+    # SHA-256 hex of the token; the plaintext is never stored
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("users.user_id",ondelete="CASCADE"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     revoked: Mapped[bool] = mapped_column(Boolean, default=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
     user = relationship("User", back_populates="refresh_tokens")
 
@@ -91,7 +99,7 @@ class PasswordResetToken(Base):
     token: Mapped[str] = mapped_column(String, unique=True, index=True)
     user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     used: Mapped[bool] = mapped_column(Boolean, default=False)
 
     user = relationship("User", back_populates="password_reset_tokens")
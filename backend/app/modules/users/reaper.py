@@ -0,0 +1,69 @@
+# reaper.py
+# Periodically deletes expired refresh tokens and spent password reset
+# tokens so their unique indexes stay small. Started from the app lifespan.
+
+import asyncio
+import logging
+import os
+from time import perf_counter
+
+from ...core.database import SessionLocal
+from ...core.metrics import metrics
+from . import repository as repo
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REAPER_ENABLED = os.getenv("TOKEN_REAPER_ENABLED", "true").lower() == "true"
+TOKEN_REAPER_INTERVAL_SECONDS = int(os.getenv("TOKEN_REAPER_INTERVAL_SECONDS", 3600))
+TOKEN_REAPER_BATCH_SIZE = int(os.getenv("TOKEN_REAPER_BATCH_SIZE", 5000))
+# stop early rather than hold a worker thread for too long; the rest goes next run
+TOKEN_REAPER_MAX_BATCHES = int(os.getenv("TOKEN_REAPER_MAX_BATCHES", 100))
+
+
+def _purge(delete_batch, batch_size: int, max_batches: int) -> int:
+    purged = 0
+    with SessionLocal() as db:
+        for _ in range(max_batches):
+            deleted = delete_batch(db, batch_size)
+            purged += deleted
+            if deleted < batch_size:
+                break
+    return purged
+
+
+def reap_tokens(
+    batch_size: int = TOKEN_REAPER_BATCH_SIZE,
+    max_batches: int = TOKEN_REAPER_MAX_BATCHES
+) -> dict:
+    """
+    One cleanup pass in bounded batches (one short transaction per batch).
+    Returns rows purged per table and the time taken.
+    """
+    started = perf_counter()
+    refresh = _purge(repo.delete_expired_refresh_tokens, batch_size, max_batches)
+    password_reset = _purge(repo.delete_spent_password_reset_tokens, batch_size, max_batches)
+    elapsed = perf_counter() - started
+
+    metrics.inc("auth.reaper.refresh_tokens_purged", refresh)
+    metrics.inc("auth.reaper.password_reset_tokens_purged", password_reset)
+    metrics.observe("auth.reaper.run", elapsed)
+    logger.info(
+        "Token reaper purged %d refresh and %d password reset tokens in %.2fs",
+        refresh, password_reset, elapsed
+    )
+    return {"refresh_tokens": refresh, "password_reset_tokens": password_reset, "seconds": elapsed}
+
+
+async def run_token_reaper(interval: int = TOKEN_REAPER_INTERVAL_SECONDS):
+    """
+    Runs reap_tokens every `interval` seconds in a worker thread until cancelled.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(reap_tokens)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            metrics.inc("auth.reaper.failures")
+            logger.exception("Token reaper run failed")
+        await asyncio.sleep(interval)
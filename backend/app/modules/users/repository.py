@@ -1,9 +1,11 @@
 # py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, or_, func, case
 from . import models, schema
 from .services import hash_password # Import the hashing utility
+from .services import hash_refresh_token
 from datetime import datetime
 
 # --- Create (Register) User ---
@@ -47,25 +49,6 @@ def get_user_by_username(db: Session, username: str):
     stmt = select(models.User).where(models.User.username == username)
     return db.execute(stmt).scalars().first()
 
-def get_user_by_username_or_email(db: Session, identifier: str):
-    """
-    Retrieves a user by username or email.
-    """
-    from .models import User  # Import Model locally to avoid circular dependencies
-    
-    # Check for email first
-    stmt = select(User).where(User.email == identifier)
-    user = db.execute(stmt).scalars().first()
-    
-    if user:
-        return user
-        
-    # If not found by email, check for username
-    stmt = select(User).where(User.username == identifier)
-    user = db.execute(stmt).scalars().first()
-    
-    return user
-
 def create_user(db: Session, user: schema.UserRegister):
     hashed_pass = hash_password(user.password)
     db_user = models.User(
@@ -88,42 +71,111 @@ def get_user_by_username(db: Session, username: str):
     return db.execute(stmt).scalars().first()
 
 def get_user_by_username_or_email(db: Session, identifier: str):
-    stmt = select(models.User).where(models.User.email == identifier)
-    user = db.execute(stmt).scalars().first()
-    if user:
-        return user
-
-    stmt = select(models.User).where(models.User.username == identifier)
-    return db.execute(stmt).scalars().first()
+    """
+    Retrieves a user by email or username, case-insensitively, in one query
+    (served by the lower(email) / lower(username) indexes).
+    An email match wins over a username match, then an exact-case match.
+    """
+    return db.execute(_login_lookup(identifier)).scalars().first()
+
+async def get_user_by_username_or_email_async(db: AsyncSession, identifier: str):
+    """AsyncSession variant of get_user_by_username_or_email."""
+    return (await db.execute(_login_lookup(identifier))).scalars().first()
+
+def _login_lookup(identifier: str):
+    User = models.User
+    normalized = identifier.lower()
+    return (
+        select(User)
+        .where(or_(
+            func.lower(User.email) == normalized,
+            func.lower(User.username) == normalized
+        ))
+        .order_by(
+            case((func.lower(User.email) == normalized, 0), else_=1),
+            case((User.username == identifier, 0), else_=1)
+        )
+        .limit(1)
+    )
 
 # ----------------- Refresh token helpers -----------------
 
-def save_refresh_token(db: Session, user_id, token_str: str):
-    rt = models.RefreshToken(token=token_str, user_id=user_id)
+def save_refresh_token(db: Session, token_id, user_id, token_str: str, expires_at: datetime):
+    rt = models.RefreshToken(
+        id=token_id,
+        token_hash=hash_refresh_token(token_str),
+        user_id=user_id,
+        expires_at=expires_at
+    )
     db.add(rt)
     db.commit()
     db.refresh(rt)
     return rt
 
+async def save_refresh_token_async(db: AsyncSession, token_id, user_id, token_str: str, expires_at: datetime):
+    """AsyncSession variant of save_refresh_token; commits whatever else is pending too."""
+    rt = models.RefreshToken(
+        id=token_id,
+        token_hash=hash_refresh_token(token_str),
+        user_id=user_id,
+        expires_at=expires_at
+    )
+    db.add(rt)
+    await db.commit()
+    return rt
+
 def get_refresh_token(db: Session, token_str: str):
-    stmt = select(models.RefreshToken).where(models.RefreshToken.token == token_str)
+    stmt = select(models.RefreshToken).where(
+        models.RefreshToken.token_hash == hash_refresh_token(token_str)
+    )
     return db.execute(stmt).scalars().first()
 
 def revoke_refresh_token(db: Session, token_str: str):
-    rt = get_refresh_token(db, token_str)
-    if rt:
-        rt.revoked = True
-        db.add(rt)
-        db.commit()
-        return rt
+    """
+    Revokes one token with a single UPDATE. Returns its id, or None if unknown.
+    """
+    stmt = (
+        update(models.RefreshToken)
+        .where(models.RefreshToken.token_hash == hash_refresh_token(token_str))
+        .values(revoked=True, revoked_at=func.now())
+        .returning(models.RefreshToken.id)
+        .execution_options(synchronize_session=False)
+    )
+    token_id = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return token_id
 
 def revoke_user_refresh_tokens(db: Session, user_id):
-    stmt = select(models.RefreshToken).where(models.RefreshToken.user_id == user_id)
-    tokens = db.execute(stmt).scalars().all()
-    for t in tokens:
-        t.revoked = True
-        db.add(t)
-        db.commit()
+    """
+    Revokes all of a user's live tokens in one UPDATE. Returns their ids.
+    """
+    stmt = (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.revoked.is_(False)
+        )
+        .values(revoked=True, revoked_at=func.now())
+        .returning(models.RefreshToken.id)
+        .execution_options(synchronize_session=False)
+    )
+    token_ids = list(db.execute(stmt).scalars().all())
+    db.commit()
+    return token_ids
+
+def get_revoked_refresh_tokens(db: Session, since: datetime | None = None):
+    """
+    (id, expires_at) of revoked tokens that have not expired yet,
+    optionally only those revoked at or after `since`.
+    """
+    RefreshToken = models.RefreshToken
+    stmt = select(RefreshToken.id, RefreshToken.expires_at).where(
+        RefreshToken.revoked.is_(True),
+        RefreshToken.expires_at > func.now()
+    )
+    if since is not None:
+        stmt = stmt.where(RefreshToken.revoked_at >= since)
+    return [tuple(row) for row in db.execute(stmt).all()]
 
 # ----------------- Password reset helpers -----------------
 
@@ -141,4 +193,36 @@ def get_password_reset_token(db: Session, token_str: str):
 def mark_password_reset_used(db: Session, token_obj):
     token_obj.used = True
     db.add(token_obj)
-    db.commit()
\ No newline at end of file
+    db.commit()
+# ----------------- Expired token cleanup -----------------
+
+def delete_expired_refresh_tokens(db: Session, batch_size: int) -> int:
+    """
+    Deletes up to `batch_size` expired refresh tokens (revoked ones are kept
+    until they expire so the revocation sync can still see them).
+    """
+    RefreshToken = models.RefreshToken
+    batch = (
+        select(RefreshToken.id)
+        .where(RefreshToken.expires_at < func.now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = db.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch.scalar_subquery())))
+    db.commit()
+    return result.rowcount
+
+def delete_spent_password_reset_tokens(db: Session, batch_size: int) -> int:
+    """
+    Deletes up to `batch_size` used or expired password reset tokens.
+    """
+    PasswordResetToken = models.PasswordResetToken
+    batch = (
+        select(PasswordResetToken.id)
+        .where(or_(PasswordResetToken.used.is_(True), PasswordResetToken.expires_at < func.now()))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = db.execute(delete(PasswordResetToken).where(PasswordResetToken.id.in_(batch.scalar_subquery())))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,77 @@
+# revocation.py
+# Per-process set of revoked refresh token ids.
+#
+# Refresh tokens are signed (see services.create_refresh_token), so the only
+# thing /auth/refresh needs from the DB is "has this token been revoked?".
+# Revocations made by this process are added immediately; revocations made by
+# other workers are picked up by an incremental sync every
+# REFRESH_REVOCATION_SYNC_SECONDS.
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from uuid import UUID
+
+from ...core.database import SessionLocal
+from ...core.metrics import metrics
+from . import repository as repo
+
+REFRESH_REVOCATION_SYNC_SECONDS = int(os.getenv("REFRESH_REVOCATION_SYNC_SECONDS", 30))
+
+# overlap between syncs so rows committed around the sync boundary are not missed
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class RevokedRefreshTokens:
+
+    def __init__(self, sync_interval: int):
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._revoked: dict[UUID, datetime] = {}   # token id -> token expiry
+        self._synced_at: datetime | None = None
+        self._next_sync = 0.0
+        metrics.register_gauge("auth.revoked_refresh_tokens", self.__len__)
+
+    def add(self, token_ids: list[UUID], expires_at: datetime | None = None):
+        # without a known expiry keep the entry until the next full reload
+        expiry = expires_at or datetime.max.replace(tzinfo=timezone.utc)
+        with self._lock:
+            for token_id in token_ids:
+                self._revoked[token_id] = expiry
+
+    def is_revoked(self, token_id: UUID) -> bool:
+        self.sync()
+        return token_id in self._revoked
+
+    def sync(self, force: bool = False):
+        if not force and monotonic() < self._next_sync:
+            return
+
+        with self._lock:
+            if not force and monotonic() < self._next_sync:
+                return
+
+            now = datetime.now(timezone.utc)
+            since = self._synced_at - SYNC_OVERLAP if self._synced_at else None
+            with SessionLocal() as db:
+                rows = repo.get_revoked_refresh_tokens(db, since)
+            metrics.inc("auth.revocation_syncs")
+
+            if since is None:
+                self._revoked = {}
+            for token_id, expiry in rows:
+                self._revoked[token_id] = expiry if expiry.tzinfo else expiry.replace(tzinfo=timezone.utc)
+
+            # expired tokens fail signature/expiry checks anyway
+            for token_id in [t for t, expiry in self._revoked.items() if expiry <= now]:
+                del self._revoked[token_id]
+
+            self._synced_at = now
+            self._next_sync = monotonic() + self.sync_interval
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_refresh_tokens = RevokedRefreshTokens(REFRESH_REVOCATION_SYNC_SECONDS)
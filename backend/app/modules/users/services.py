@@ -1,14 +1,19 @@
 
 # services.py
 
-from passlib.context import CryptContext
 from jose import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+import base64
+import hashlib
+import hmac
 import secrets
 from typing import Tuple
 import os
 from dotenv import load_dotenv
 
+from ...core.security import hash_password, verify_password, verify_and_update, verify_and_update_async
+
 # Load environment variables
 load_dotenv()
 
@@ -30,19 +35,11 @@ Argon2 provides:
 - built-in salting
 - memory-hard hashing (resistant to GPU attacks)
 - recommended for modern applications
-"""
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
-
-def hash_password(password: str) -> str:
-    """Hash a plaintext password securely using Argon2."""
-    return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plaintext password against a stored Argon2 hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+The context, cost parameters and the bounded hashing pool live in
+app.core.security; hash_password / verify_password / verify_and_update
+(and verify_and_update_async) are re-exported from here for the users module.
+"""
 
 
 
@@ -74,12 +71,43 @@ def decode_access_token(token: str) -> dict:
 # -------------------------------------------------------------------
 # REFRESH TOKEN CREATION
 # -------------------------------------------------------------------
-def create_refresh_token() -> Tuple[str, datetime]:
+def create_refresh_token(user_id: UUID) -> Tuple[UUID, str, datetime]:
     """
-    Creates a secure opaque refresh token (random string).
+    Creates a signed opaque refresh token:
+        "<token id>.<user id>.<expiry (unix)>.<HMAC signature>"
     Refresh tokens are NOT JWTs.
-    They are stored in the DB and can be revoked.
+    The signature lets /auth/refresh validate them without a DB lookup;
+    the DB only keeps a SHA-256 hash (for logout) and the revocation state.
+    """
+    token_id = uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    body = f"{token_id.hex}.{UUID(str(user_id)).hex}.{int(expires_at.timestamp())}"
+    return token_id, f"{body}.{_sign_refresh_token(body)}", expires_at
+
+
+def _sign_refresh_token(body: str) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), body.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def hash_refresh_token(token: str) -> str:
+    """Fixed-size value stored in (and looked up from) refresh_tokens.token_hash."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def parse_refresh_token(token: str) -> Tuple[UUID, UUID] | None:
+    """
+    Returns (token_id, user_id) if the signature is valid and the token has
+    not expired, else None. Revocation is checked separately.
     """
-    token = secrets.token_urlsafe(64)
-    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    return token, expires_at
+    try:
+        token_id, user_id, expires, signature = token.split(".")
+        expired = int(expires) < datetime.now(timezone.utc).timestamp()
+        token_uuid, user_uuid = UUID(token_id), UUID(user_id)
+    except ValueError:
+        return None
+
+    body = f"{token_id}.{user_id}.{expires}"
+    if expired or not hmac.compare_digest(signature, _sign_refresh_token(body)):
+        return None
+    return token_uuid, user_uuid
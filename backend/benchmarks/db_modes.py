@@ -0,0 +1,67 @@
+# benchmarks/db_modes.py
+# Requests/sec for the same event-page query served by a sync (threadpool)
+# route and an async (event loop) route.
+#
+# Needs the usual DB_* env vars pointing at a populated database.
+#
+#   python -m benchmarks.db_modes --requests 2000 --concurrency 100
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.model_registry
+from app.core.database import get_db, get_async_db
+from app.modules.events.repository import EventRepository, AsyncEventRepository
+
+
+def build_app() -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/sync")
+    def sync_page(db: Session = Depends(get_db)):
+        return len(EventRepository.get_page(db, limit=20))
+
+    @bench.get("/async")
+    async def async_page(db: AsyncSession = Depends(get_async_db)):
+        return len(await AsyncEventRepository.get_page(db, limit=20))
+
+    return bench
+
+
+async def run(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm both pools before measuring
+        await run(client, "/sync", 50, 10)
+        await run(client, "/async", 50, 10)
+
+        for path in ("/sync", "/async"):
+            rps = await run(client, path, requests, concurrency)
+            print(f"{path:<8} {rps:10.1f} req/s  ({requests} requests, concurrency {concurrency})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,64 @@
+# benchmarks/import_time.py
+# Import-time report for the app factory, from `python -X importtime`.
+#
+# Imports main.py in a fresh interpreter (APP_FEATURES is honoured, so
+# feature sets can be compared) and prints the slowest modules by
+# cumulative time and the self time per top-level package. With --budget-ms
+# it exits non-zero when the total goes over budget, for CI.
+#
+#   python -m benchmarks.import_time
+#   APP_FEATURES=auth,scanner python -m benchmarks.import_time --top 15
+#   python -m benchmarks.import_time --budget-ms 1500
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def collect(module: str) -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every import, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=os.environ, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(module: str, top: int, budget_ms: float | None) -> int:
+    rows = collect(module)
+    total_ms = next(c for name, _, c in reversed(rows) if name == module) / 1000
+
+    print(f"APP_FEATURES={os.getenv('APP_FEATURES', 'all')} import {module}: {total_ms:.1f} ms, {len(rows)} modules")
+
+    print(f"\nslowest {top} modules (cumulative):")
+    for name, _, cumulative in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\nslowest {top} packages (self):")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"\nimport time {total_ms:.1f} ms is over the {budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(main(args.module, args.top, args.budget_ms))
@@ -0,0 +1,61 @@
+# benchmarks/password_hashing.py
+# Argon2 cost vs. login capacity through the bounded hashing pool.
+#
+# Cost parameters come from ARGON2_TIME_COST / ARGON2_MEMORY_COST /
+# ARGON2_PARALLELISM and pool size from PASSWORD_HASH_WORKERS /
+# PASSWORD_HASH_QUEUE, exactly as in the app.
+#
+#   ARGON2_MEMORY_COST=19456 python -m benchmarks.password_hashing --logins 200 --concurrency 32
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core import security
+
+
+def one_login(stored_hash: str) -> str:
+    try:
+        security.verify_password("correct horse battery staple", stored_hash)
+        return "ok"
+    except HTTPException:
+        return "rejected"
+
+
+def main(logins: int, concurrency: int):
+    print(
+        f"argon2 time_cost={security.ARGON2_TIME_COST} "
+        f"memory_cost={security.ARGON2_MEMORY_COST}KiB "
+        f"parallelism={security.ARGON2_PARALLELISM} | "
+        f"pool workers={security.PASSWORD_HASH_WORKERS} queue={security.PASSWORD_HASH_QUEUE}"
+    )
+
+    started = time.perf_counter()
+    stored_hash = security.hash_password("correct horse battery staple")
+    print(f"single hash (includes pool start): {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    security.verify_password("correct horse battery staple", stored_hash)
+    print(f"single verify:                     {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        results = list(threads.map(one_login, [stored_hash] * logins))
+    elapsed = time.perf_counter() - started
+
+    accepted = results.count("ok")
+    print(
+        f"{logins} logins @ concurrency {concurrency}: "
+        f"{accepted / elapsed:8.1f} verified/s, {results.count('rejected')} rejected (429)"
+    )
+    security.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    main(args.logins, args.concurrency)
@@ -0,0 +1,152 @@
+# benchmarks/payment_completion.py
+# Payments completed/sec and per-payment latency, old flow vs. new flow.
+#
+#   before: load payment, update + commit, refresh, load registration,
+#           update + commit (two transactions)
+#   after:  the completion webhook appends to the inbox
+#           (PaymentService.record_webhook), then payments.inbox applies
+#           the events in batches (apply_webhook_events); reported as
+#           webhook latency plus the time until every payment is applied
+#
+# Creates its own user, category, event, registrations and pending payments
+# against the configured database and deletes them afterwards.
+#
+#   DB_POOL_SIZE=20 python -m benchmarks.payment_completion --payments 2000 --concurrency 16
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select
+
+import app.core.model_registry
+from app.core.database import SessionLocal
+from app.modules.events.models import Event, EventCategory, EventRegistration, RegistrationStatus
+from app.modules.payments.inbox import apply_webhook_events
+from app.modules.payments.models import Payment, PaymentStatus, PaymentWebhookEvent
+from app.modules.payments.services import PaymentService
+from app.modules.users.models import User
+
+
+def setup(count: int):
+    with SessionLocal() as db:
+        user = User(username=f"pay-{uuid4().hex[:8]}", email=f"{uuid4().hex}@example.com", hashed_password="x")
+        category = EventCategory(name=f"pay-{uuid4().hex[:8]}")
+        db.add_all([user, category])
+        db.flush()
+        event = Event(
+            title=f"payment bench {uuid4().hex[:8]}",
+            category_id=category.category_id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=30),
+            end_date=datetime.now(timezone.utc) + timedelta(days=31),
+            venue="bench",
+            address="bench",
+            created_by=user.user_id
+        )
+        db.add(event)
+        db.flush()
+
+        registrations = [
+            {
+                "registration_id": uuid4(), "event_id": event.event_id, "name": f"Attendee {i}",
+                "email": f"attendee{i}@example.com", "phone": "0", "qr_code": str(uuid4()),
+                "status": RegistrationStatus.pending
+            }
+            for i in range(count)
+        ]
+        payments = [
+            {
+                "payment_id": uuid4(), "registration_id": r["registration_id"], "amount": 10.0,
+                "currency": "USD", "status": PaymentStatus.pending, "transaction_id": uuid4()
+            }
+            for r in registrations
+        ]
+        db.execute(insert(EventRegistration), registrations)
+        db.execute(insert(Payment), payments)
+        db.commit()
+        return user.user_id, category.category_id, event.event_id, [p["payment_id"] for p in payments]
+
+
+def teardown(user_id, category_id, event_id, payment_ids):
+    with SessionLocal() as db:
+        db.execute(delete(PaymentWebhookEvent).where(PaymentWebhookEvent.payment_id.in_(payment_ids)))
+        db.execute(delete(EventRegistration).where(EventRegistration.event_id == event_id))
+        db.execute(delete(Event).where(Event.event_id == event_id))
+        db.execute(delete(EventCategory).where(EventCategory.category_id == category_id))
+        db.execute(delete(User).where(User.user_id == user_id))
+        db.commit()
+
+
+def complete_before(payment_id):
+    with SessionLocal() as db:
+        payment = db.query(Payment).filter(Payment.payment_id == payment_id).first()
+        payment.status = PaymentStatus.completed
+        payment.transaction_id = uuid4()
+        db.commit()
+        db.refresh(payment)
+        registration = (
+            db.query(EventRegistration)
+            .filter(EventRegistration.registration_id == payment.registration_id)
+            .first()
+        )
+        registration.status = RegistrationStatus.confirmed
+        db.commit()
+
+
+def complete_after(payment_id):
+    with SessionLocal() as db:
+        PaymentService.record_webhook(db, payment_id, uuid4(), PaymentStatus.completed)
+
+
+def drain_inbox(payment_ids: list):
+    """Applies the inbox until every payment is completed."""
+    while True:
+        apply_webhook_events()
+        with SessionLocal() as db:
+            pending = db.execute(
+                select(func.count()).select_from(Payment)
+                .where(Payment.payment_id.in_(payment_ids), Payment.status != PaymentStatus.completed)
+            ).scalar_one()
+        if not pending:
+            return
+
+
+def timed(fn):
+    def run(payment_id):
+        started = time.perf_counter()
+        fn(payment_id)
+        return time.perf_counter() - started
+    return run
+
+
+def measure(name: str, fn, payment_ids: list, concurrency: int, then=None):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        latencies = sorted(threads.map(timed(fn), payment_ids))
+    if then:
+        then(payment_ids)
+    elapsed = time.perf_counter() - started
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<8} {len(payment_ids) / elapsed:10,.0f} payments/s  "
+          f"mean {statistics.mean(latencies) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms")
+
+
+def main(count: int, concurrency: int):
+    fixtures = setup(count * 2)
+    payment_ids = fixtures[3]
+    try:
+        measure("before", complete_before, payment_ids[:count], concurrency)
+        measure("after", complete_after, payment_ids[count:], concurrency, then=drain_inbox)
+    finally:
+        teardown(*fixtures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    main(args.payments, args.concurrency)
@@ -0,0 +1,104 @@
+# benchmarks/registration_load.py
+# On-sale rush: many concurrent registrations for one event with a small
+# capacity. Checks that exactly `capacity` registrations get in, that
+# seats_taken matches the rows written, and reports registrations/sec.
+#
+# Creates its own user, category and event and deletes them afterwards.
+# Concurrency is bounded by the DB pool, so raise DB_POOL_SIZE /
+# DB_MAX_OVERFLOW with it, e.g.
+#
+#   DB_POOL_SIZE=50 DB_MAX_OVERFLOW=50 python -m benchmarks.registration_load \
+#       --requests 5000 --capacity 1000 --concurrency 100
+
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+import app.core.model_registry
+from app.core.database import SessionLocal
+from app.modules.events.models import Event, EventCategory, EventRegistration
+from app.modules.events.schema import EventRegistrationCreate
+from app.modules.events.services import EventService, sold_out_events
+from app.modules.users.models import User
+
+
+def setup(capacity: int):
+    with SessionLocal() as db:
+        user = User(username=f"load-{uuid4().hex[:8]}", email=f"{uuid4().hex}@example.com", hashed_password="x")
+        category = EventCategory(name=f"load-{uuid4().hex[:8]}")
+        db.add_all([user, category])
+        db.flush()
+        event = Event(
+            title=f"load test {uuid4().hex[:8]}",
+            category_id=category.category_id,
+            start_date=datetime.now(timezone.utc) + timedelta(days=30),
+            end_date=datetime.now(timezone.utc) + timedelta(days=31),
+            venue="bench",
+            address="bench",
+            created_by=user.user_id,
+            capacity=capacity
+        )
+        db.add(event)
+        db.commit()
+        return user.user_id, category.category_id, event.event_id
+
+
+def teardown(user_id, category_id, event_id):
+    with SessionLocal() as db:
+        db.execute(delete(EventRegistration).where(EventRegistration.event_id == event_id))
+        db.execute(delete(Event).where(Event.event_id == event_id))
+        db.execute(delete(EventCategory).where(EventCategory.category_id == category_id))
+        db.execute(delete(User).where(User.user_id == user_id))
+        db.commit()
+
+
+def register(event_id) -> str:
+    payload = EventRegistrationCreate(event_id=event_id, name="Load Test", email="load@example.com", phone="0")
+    with SessionLocal() as db:
+        try:
+            EventService.register_user(db, event_id, payload)
+            return "registered"
+        except HTTPException as exc:
+            return "sold_out" if exc.status_code == 409 else f"http_{exc.status_code}"
+        except Exception as exc:
+            return type(exc).__name__
+
+
+def main(requests: int, capacity: int, concurrency: int):
+    user_id, category_id, event_id = setup(capacity)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as threads:
+            outcomes = Counter(threads.map(register, [event_id] * requests))
+        elapsed = time.perf_counter() - started
+
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(func.count()).select_from(EventRegistration).where(EventRegistration.event_id == event_id)
+            ).scalar_one()
+            seats_taken = db.execute(select(Event.seats_taken).where(Event.event_id == event_id)).scalar_one()
+
+        print(f"{requests} registrations @ concurrency {concurrency}, capacity {capacity}: {elapsed:.2f}s "
+              f"({requests / elapsed:,.0f} req/s)")
+        print(f"outcomes: {dict(outcomes)}")
+        print(f"registration rows: {rows}, seats_taken: {seats_taken}")
+        ok = rows == seats_taken == min(requests, capacity) and outcomes["registered"] == rows
+        print("OK: no overselling" if ok else "FAIL: counts do not match")
+    finally:
+        sold_out_events.clear()
+        teardown(user_id, category_id, event_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    main(args.requests, args.capacity, args.concurrency)
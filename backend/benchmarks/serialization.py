@@ -0,0 +1,82 @@
+# benchmarks/serialization.py
+# Rows/sec serialized for the registration list, old path vs. new path.
+#
+#   before: ORM objects -> jsonable_encoder -> json.dumps (FastAPI without
+#           a response_model)
+#   after:  column rows -> precompiled TypeAdapter -> pydantic-core JSON
+#           (core/serialization.dump_json)
+#
+# Builds the rows in memory, no database needed.
+#
+#   python -m benchmarks.serialization --rows 50000
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.engine import result_tuple
+
+import app.core.model_registry
+from app.core.serialization import dump_json
+from app.modules.events.models import EventRegistration, RegistrationStatus
+from app.modules.events.schema import EventRegistrationReadList
+
+
+def make_registrations(count: int) -> list[EventRegistration]:
+    event_id = uuid4()
+    return [
+        EventRegistration(
+            registration_id=uuid4(),
+            event_id=event_id,
+            user_id=None,
+            name=f"Attendee {i}",
+            email=f"attendee{i}@example.com",
+            phone="+10000000000",
+            qr_code=str(uuid4()),
+            status=RegistrationStatus.confirmed,
+            registered_at=datetime.now(timezone.utc)
+        )
+        for i in range(count)
+    ]
+
+
+def as_rows(registrations: list[EventRegistration]) -> list:
+    # same shape the repository returns for select(EventRegistration.__table__)
+    columns = select(EventRegistration.__table__).selected_columns.keys()
+    make_row = result_tuple(list(columns))
+    return [make_row([getattr(r, c) for c in columns]) for r in registrations]
+
+
+def measure(name: str, rows: int, fn) -> bytes:
+    started = time.perf_counter()
+    body = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<44} {rows / elapsed:12,.0f} rows/s  {len(body) / 1e6:6.1f} MB")
+    return body
+
+
+def main(count: int):
+    registrations = make_registrations(count)
+    rows = as_rows(registrations)
+
+    before = measure(
+        "before: ORM + jsonable_encoder + json.dumps", count,
+        lambda: json.dumps(jsonable_encoder(registrations)).encode()
+    )
+    after = measure(
+        "after:  rows + TypeAdapter.dump_json", count,
+        lambda: dump_json(EventRegistrationReadList, rows)
+    )
+    # same rows (datetimes differ only in notation: "+00:00" vs "Z")
+    assert [r["registration_id"] for r in json.loads(before)] == [r["registration_id"] for r in json.loads(after)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.rows)
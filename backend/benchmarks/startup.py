@@ -0,0 +1,66 @@
+# benchmarks/startup.py
+# Cold start of one worker: import of main.py, lifespan startup and the
+# first requests, each measured in a fresh interpreter.
+#
+# Run it once per startup mode, e.g.
+#
+#   python -m benchmarks.startup --runs 5
+#   DB_CREATE_ALL=true python -m benchmarks.startup --runs 5
+#
+# Needs the usual DB_* env vars (the second request hits the database).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    client.get("/")
+    first_request = time.perf_counter()
+    client.get("/events/", params={"limit": 1})
+    first_db_request = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - imported,
+    "first_request": first_request - ready,
+    "first_db_request": first_db_request - first_request,
+    "total": first_db_request - started,
+}))
+"""
+
+PHASES = ("import", "startup", "first_request", "first_db_request", "total")
+
+
+def one_run() -> dict:
+    env = dict(os.environ, TOKEN_REAPER_ENABLED="false")
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int):
+    print(f"DB_CREATE_ALL={os.getenv('DB_CREATE_ALL', 'false')} runs={runs}")
+    samples = [one_run() for _ in range(runs)]
+    for phase in PHASES:
+        values = [s[phase] * 1000 for s in samples]
+        print(f"{phase:>16}: median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs)
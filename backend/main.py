@@ -1,24 +1,132 @@
 # main.py
 
-from fastapi import FastAPI
+import asyncio
+import importlib
+import os
+import secrets
+import sys
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import Base ,engine
-import app.core.model_registry 
-from app.modules.users.models import Base
-from app.modules.events.models import Base
-from app.modules.tickets.models import Base
-from app.modules.payments.models import Base
-from app.modules.scanners.models import Base
-from app.modules.users.auth import router as auth_router
-from app.modules.events.routes import router as event_router
-from app.modules.payments.routes import router as payment_router
-from app.modules.tickets.routes import router as ticket_router
-def create_app():
+from sqlalchemy.orm import configure_mappers
+
+from app.core.database import Base, engine, DB_CREATE_ALL
+from app.core.metrics import metrics
+import app.core.model_registry
+
+
+# -------------------------------
+# Feature sets
+# -------------------------------
+# Router modules are imported only for the features this worker serves,
+# e.g. a scanner-only worker: APP_FEATURES=auth,scanner
+FEATURES = {
+    "auth": "app.modules.users.auth",
+    "events": "app.modules.events.routes",
+    "payments": "app.modules.payments.routes",
+    "tickets": "app.modules.tickets.routes",
+    "scanner": "app.modules.scanners.routes",
+}
+APP_FEATURES = os.getenv("APP_FEATURES", "all")
+
+
+def resolve_features(features: str | list[str]) -> list[str]:
+    if isinstance(features, str):
+        features = [f.strip() for f in features.split(",") if f.strip()]
+    if "all" in features:
+        return list(FEATURES)
+
+    unknown = [f for f in features if f not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown APP_FEATURES {unknown}, expected any of {list(FEATURES)}")
+    return [f for f in FEATURES if f in features]
+
+
+# -------------------------------
+# Metrics endpoint
+# -------------------------------
+# /metrics exposes pool, cache and queue internals: only mounted with
+# METRICS_ENABLED=true, and then only answers `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def require_metrics_token(authorization: str | None = Header(default=None)):
+    expected = f"Bearer {METRICS_TOKEN}"
+    if not authorization or not secrets.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def _loaded(module_name: str, attr: str):
+    """The object if its module was imported by some feature, else None."""
+    module = sys.modules.get(module_name)
+    return getattr(module, attr, None) if module else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # -------------------------------
+    # Database Table Creation (local dev only, see DB_CREATE_ALL)
+    # -------------------------------
+    if DB_CREATE_ALL:
+        await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+
+    # -------------------------------
+    # Background tasks
+    # -------------------------------
+    tasks = []
+    if "auth" in app.state.features:
+        from app.modules.users.reaper import run_token_reaper, TOKEN_REAPER_ENABLED
+        if TOKEN_REAPER_ENABLED:
+            tasks.append(asyncio.create_task(run_token_reaper()))
+    if "events" in app.state.features:
+        from app.modules.events.holds import run_hold_expirer
+        tasks.append(asyncio.create_task(run_hold_expirer()))
+    if "payments" in app.state.features:
+        from app.modules.payments.inbox import run_inbox_applier
+        tasks.append(asyncio.create_task(run_inbox_applier()))
+        from app.modules.payments.totals import run_totals_reconciler, PAYMENT_TOTALS_RECONCILE_ENABLED
+        if PAYMENT_TOTALS_RECONCILE_ENABLED:
+            tasks.append(asyncio.create_task(run_totals_reconciler()))
+    # check-in counters are fed by both the events and the scanner feature
+    if _loaded("app.modules.scanners.counters", "checkin_counters"):
+        from app.modules.scanners.counters import run_counter_checkpointer
+        tasks.append(asyncio.create_task(run_counter_checkpointer()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    # persist queued scanner check-ins and counters, stop worker processes
+    checkin_writer = _loaded("app.modules.scanners.writer", "checkin_writer")
+    if checkin_writer:
+        await asyncio.to_thread(checkin_writer.close)
+    checkin_counters = _loaded("app.modules.scanners.counters", "checkin_counters")
+    if checkin_counters:
+        await asyncio.to_thread(checkin_counters.checkpoint)
+    for module_name, attr in (
+        ("app.modules.tickets.rendering", "qr_renderer"),
+        ("app.core.security", "password_hasher"),
+    ):
+        pool = _loaded(module_name, attr)
+        if pool:
+            pool.shutdown()
+
+
+def create_app(features: str | list[str] = APP_FEATURES):
+    features = resolve_features(features)
+
     app = FastAPI(
         title="Event Management Backend",
         description="FastAPI backend with JWT auth and PostgreSQL",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     # -------------------------------
@@ -33,22 +141,34 @@ def create_app():
     )
 
     # -------------------------------
-    # Database Table Creation
+    # ORM setup
     # -------------------------------
-    
-    Base.metadata.create_all(bind=engine)
+    # resolve relationships now instead of on the first request; no DB access
+    configure_mappers()
 
     # -------------------------------
-    # All Routers
+    # Routers of the selected features
     # -------------------------------
-    app.include_router(auth_router)
-    app.include_router(event_router)
-    app.include_router(payment_router)
-    app.include_router(ticket_router)
+    app.state.features = features
+    for feature in features:
+        with metrics.timer(f"startup.import.{feature}"):
+            module = importlib.import_module(FEATURES[feature])
+        app.include_router(module.router)
 
     @app.get("/", tags=["Root"])
     def root():
-        return {"message": "Backend is running successfully!"}
+        return {"message": "Backend is running successfully!", "features": app.state.features}
+
+    if METRICS_ENABLED:
+        if not METRICS_TOKEN:
+            raise RuntimeError("METRICS_ENABLED=true needs METRICS_TOKEN")
+
+        @app.get("/metrics", tags=["Root"], dependencies=[Depends(require_metrics_token)])
+        def get_metrics():
+            """
+            In-process metrics snapshot (pool usage, checkout latency, ...).
+            """
+            return metrics.snapshot()
 
     return app
 
@@ -0,0 +1,166 @@
+"""initial schema
+
+Schema as previously created by Base.metadata.create_all at app startup.
+Databases created that way: `alembic stamp 0001` and then `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_categories',
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('category_id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('events',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('venue', sa.String(length=100), nullable=False),
+    sa.Column('address', sa.String(length=255), nullable=False),
+    sa.Column('banner_url', sa.String(length=255), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['event_categories.category_id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index(op.f('ix_events_title'), 'events', ['title'], unique=True)
+    op.create_table('password_reset_tokens',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('token', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('used', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_password_reset_tokens_token'), 'password_reset_tokens', ['token'], unique=True)
+    op.create_table('refresh_tokens',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('token', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
+    op.create_table('event_organisers',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role', sa.Enum('admin', 'staff', 'volunteer', name='organiser_role_enum'), nullable=False),
+    sa.Column('added_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('event_registrations',
+    sa.Column('registration_id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('qr_code', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'confirmed', 'cancelled', name='registration_status_enum'), nullable=False),
+    sa.Column('registered_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('registration_id')
+    )
+    op.create_table('event_sessions',
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('speaker', sa.String(length=100), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_table('checkins',
+    sa.Column('checkin_id', sa.UUID(), nullable=False),
+    sa.Column('registration_id', sa.UUID(), nullable=False),
+    sa.Column('checkin_time', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('gate', sa.String(length=50), nullable=True),
+    sa.Column('device_id', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['registration_id'], ['event_registrations.registration_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('checkin_id')
+    )
+    op.create_table('payments',
+    sa.Column('payment_id', sa.UUID(), nullable=False),
+    sa.Column('registration_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'completed', 'failed', name='payment_status_enum'), nullable=False),
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['registration_id'], ['event_registrations.registration_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('payment_id')
+    )
+    op.create_table('tickets',
+    sa.Column('ticket_id', sa.UUID(), nullable=False),
+    sa.Column('registration_id', sa.UUID(), nullable=False),
+    sa.Column('qr_code', sa.String(length=255), nullable=False),
+    sa.Column('issued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('pdf_url', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['registration_id'], ['event_registrations.registration_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_id'),
+    sa.UniqueConstraint('qr_code')
+    )
+
+
+def downgrade():
+    op.drop_table('tickets')
+    op.drop_table('payments')
+    op.drop_table('checkins')
+    op.drop_table('event_sessions')
+    op.drop_table('event_registrations')
+    op.drop_table('event_organisers')
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
+    op.drop_index(op.f('ix_password_reset_tokens_token'), table_name='password_reset_tokens')
+    op.drop_table('password_reset_tokens')
+    op.drop_index(op.f('ix_events_title'), table_name='events')
+    op.drop_table('events')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('event_categories')
+    sa.Enum(name='payment_status_enum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='registration_status_enum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='organiser_role_enum').drop(op.get_bind(), checkfirst=True)
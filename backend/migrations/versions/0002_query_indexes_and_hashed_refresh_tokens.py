@@ -0,0 +1,92 @@
+"""query indexes and hashed refresh tokens
+
+Indexes for event pagination, RBAC, scanning and login lookups, one ticket
+per registration, and refresh tokens stored as hashes with an expiry.
+
+Existing refresh tokens are plaintext and unsigned, so they are deleted:
+users have to log in again once after this migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # events: keyset pagination
+    op.create_index('ix_events_start_date_event_id', 'events', ['start_date', 'event_id'], unique=False)
+    op.create_index('ix_events_category_start_date', 'events', ['category_id', 'start_date', 'event_id'], unique=False)
+    op.create_index('ix_events_venue_start_date', 'events', ['venue', 'start_date', 'event_id'], unique=False)
+
+    # event_organisers: one role per user per event (keep the earliest duplicate)
+    op.execute("""
+        DELETE FROM event_organisers a
+        USING event_organisers b
+        WHERE a.event_id = b.event_id
+          AND a.user_id = b.user_id
+          AND (a.added_at, a.id) > (b.added_at, b.id)
+    """)
+    op.create_index('ux_event_organisers_event_user', 'event_organisers', ['event_id', 'user_id'], unique=True)
+
+    # event_registrations: scanner lookups by QR code
+    op.create_index(op.f('ix_event_registrations_qr_code'), 'event_registrations', ['qr_code'], unique=False)
+
+    # tickets: one ticket per registration (keep the earliest duplicate)
+    op.execute("""
+        DELETE FROM tickets a
+        USING tickets b
+        WHERE a.registration_id = b.registration_id
+          AND (a.issued_at, a.ticket_id) > (b.issued_at, b.ticket_id)
+    """)
+    op.create_unique_constraint('tickets_registration_id_key', 'tickets', ['registration_id'])
+
+    # users: case-insensitive login lookup
+    op.create_index('ix_users_email_lower', 'users', [sa.literal_column('lower(email)')], unique=False)
+    op.create_index('ix_users_username_lower', 'users', [sa.literal_column('lower(username)')], unique=False)
+
+    # refresh_tokens: hashed storage, expiry and revocation time
+    op.execute("DELETE FROM refresh_tokens")
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token')
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.String(length=64), nullable=False))
+    op.add_column('refresh_tokens', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False))
+    op.add_column('refresh_tokens', sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_revoked_at'), 'refresh_tokens', ['revoked_at'], unique=False)
+
+    # password_reset_tokens: token reaper
+    op.create_index(op.f('ix_password_reset_tokens_expires_at'), 'password_reset_tokens', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_password_reset_tokens_expires_at'), table_name='password_reset_tokens')
+
+    op.execute("DELETE FROM refresh_tokens")
+    op.drop_index(op.f('ix_refresh_tokens_revoked_at'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'revoked_at')
+    op.drop_column('refresh_tokens', 'expires_at')
+    op.drop_column('refresh_tokens', 'token_hash')
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(), nullable=False))
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
+
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_constraint('tickets_registration_id_key', 'tickets', type_='unique')
+    op.drop_index(op.f('ix_event_registrations_qr_code'), table_name='event_registrations')
+    op.drop_index('ux_event_organisers_event_user', table_name='event_organisers')
+    op.drop_index('ix_events_venue_start_date', table_name='events')
+    op.drop_index('ix_events_category_start_date', table_name='events')
+    op.drop_index('ix_events_start_date_event_id', table_name='events')
@@ -0,0 +1,60 @@
+"""event capacity and seat holds
+
+Capacity and an atomic seat counter on events, and an optional hold expiry
+on registrations. seats_taken is backfilled from the non-cancelled
+registrations.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('events', sa.Column('capacity', sa.Integer(), nullable=True))
+    op.add_column('events', sa.Column('seats_taken', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('events', sa.Column('hold_minutes', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE events e
+        SET seats_taken = r.taken
+        FROM (
+            SELECT event_id, count(*) AS taken
+            FROM event_registrations
+            WHERE status != 'cancelled'
+            GROUP BY event_id
+        ) r
+        WHERE e.event_id = r.event_id
+    """)
+    op.create_check_constraint(
+        'ck_events_seats_within_capacity',
+        'events',
+        'capacity IS NULL OR seats_taken <= capacity'
+    )
+
+    op.add_column('event_registrations', sa.Column('hold_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_event_registrations_pending_holds',
+        'event_registrations',
+        ['hold_expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending' AND hold_expires_at IS NOT NULL")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_event_registrations_pending_holds', table_name='event_registrations')
+    op.drop_column('event_registrations', 'hold_expires_at')
+    op.drop_constraint('ck_events_seats_within_capacity', 'events', type_='check')
+    op.drop_column('events', 'hold_minutes')
+    op.drop_column('events', 'seats_taken')
+    op.drop_column('events', 'capacity')
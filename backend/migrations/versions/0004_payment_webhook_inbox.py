@@ -0,0 +1,44 @@
+"""payment webhook inbox
+
+Inbox of payment provider callbacks keyed by transaction ID, applied to
+payments and registrations by a background worker.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payment_webhook_events',
+    sa.Column('transaction_id', sa.UUID(), nullable=False),
+    sa.Column('payment_id', sa.UUID(), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending', 'completed', 'failed', name='payment_status_enum', create_type=False), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('error', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index(
+        'ix_payment_webhook_events_unprocessed',
+        'payment_webhook_events',
+        ['received_at'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_payment_webhook_events_unprocessed', table_name='payment_webhook_events')
+    op.drop_table('payment_webhook_events')
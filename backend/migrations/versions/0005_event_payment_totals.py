@@ -0,0 +1,48 @@
+"""event payment totals
+
+Per-event payment count and amount by status and currency, backfilled from
+payments. payments.transaction_id becomes nullable: a payment has no
+provider transaction until its callback arrives.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('payments', 'transaction_id', existing_type=sa.UUID(), nullable=True)
+
+    op.create_table('event_payment_totals',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending', 'completed', 'failed', name='payment_status_enum', create_type=False), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('payment_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('amount_total', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'status', 'currency')
+    )
+    op.execute("""
+        INSERT INTO event_payment_totals (event_id, status, currency, payment_count, amount_total)
+        SELECT r.event_id, p.status, p.currency, count(*), coalesce(sum(p.amount), 0)
+        FROM payments p
+        JOIN event_registrations r ON r.registration_id = p.registration_id
+        GROUP BY r.event_id, p.status, p.currency
+    """)
+
+
+def downgrade():
+    op.drop_table('event_payment_totals')
+    op.execute("UPDATE payments SET transaction_id = payment_id WHERE transaction_id IS NULL")
+    op.alter_column('payments', 'transaction_id', existing_type=sa.UUID(), nullable=False)
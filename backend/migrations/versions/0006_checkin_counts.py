@@ -0,0 +1,42 @@
+"""checkin counts
+
+Check-ins per event, minute, gate and device, checkpointed by the live
+counters. Backfilled from existing check-ins.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('checkin_counts',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('minute', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('gate', sa.String(length=50), nullable=False),
+    sa.Column('device_id', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'minute', 'gate', 'device_id')
+    )
+    op.execute("""
+        INSERT INTO checkin_counts (event_id, minute, gate, device_id, count)
+        SELECT r.event_id, date_trunc('minute', c.checkin_time), coalesce(c.gate, ''), coalesce(c.device_id, ''), count(*)
+        FROM checkins c
+        JOIN event_registrations r ON r.registration_id = c.registration_id
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade():
+    op.drop_table('checkin_counts')
@@ -0,0 +1,42 @@
+"""ticket issuance jobs
+
+Bulk issuance jobs move from worker memory to the DB, so their progress
+can be polled on any worker.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ticket_issuance_jobs',
+    sa.Column('job_id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('issued', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('elapsed_seconds', sa.Float(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.event_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index(op.f('ix_ticket_issuance_jobs_event_id'), 'ticket_issuance_jobs', ['event_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_ticket_issuance_jobs_event_id'), table_name='ticket_issuance_jobs')
+    op.drop_table('ticket_issuance_jobs')
@@ -0,0 +1,34 @@
+"""unique checkin per registration
+
+checkins.registration_id becomes unique, so duplicate scans are decided
+by the DB whichever worker handled them. Existing duplicates keep the
+earliest check-in.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        DELETE FROM checkins c
+        USING checkins d
+        WHERE c.registration_id = d.registration_id
+          AND (c.checkin_time, c.checkin_id) > (d.checkin_time, d.checkin_id)
+    """)
+    op.create_unique_constraint('checkins_registration_id_key', 'checkins', ['registration_id'])
+
+
+def downgrade():
+    op.drop_constraint('checkins_registration_id_key', 'checkins', type_='unique')
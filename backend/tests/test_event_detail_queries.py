@@ -0,0 +1,130 @@
+# test_event_detail_queries.py
+# The event detail endpoint must run a fixed number of queries, however
+# many sessions, organisers and registrations the event has.
+#
+# Runs against a throwaway SQLite file (aiosqlite); no Postgres needed.
+#
+#   cd backend && pip install -r requirements-dev.txt && python -m pytest tests
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+# app.core.database builds its (unused here) engines from these at import
+for name, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "test"}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import app.core.model_registry
+from app.core.database import Base
+from app.modules.events.models import (
+    Event, EventCategory, EventOrganiser, EventRegistration, EventSession, OrganiserRole
+)
+from app.modules.events.repository import AsyncEventRepository
+from app.modules.events.services import EventService
+from app.modules.users.models import User
+
+DETAIL_QUERIES = 3              # event + category (joined), sessions, organisers
+DETAIL_WITH_COUNT_QUERIES = 4   # ... plus the registration count
+
+
+def seed_event(db, size: int):
+    users = [
+        User(username=f"user{i}-{uuid4().hex[:6]}", email=f"{uuid4().hex}@example.com", hashed_password="x")
+        for i in range(size)
+    ]
+    category = EventCategory(name=f"category-{uuid4().hex[:6]}")
+    db.add_all([*users, category])
+    db.flush()
+
+    now = datetime.now(timezone.utc)
+    event = Event(
+        title=f"Query count {size}",
+        category_id=category.category_id,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=2),
+        venue="venue",
+        address="address",
+        created_by=users[0].user_id
+    )
+    db.add(event)
+    db.flush()
+
+    db.add_all([
+        EventSession(
+            event_id=event.event_id, title=f"Session {i}", speaker="speaker",
+            start_time=now + timedelta(days=1, hours=i), end_time=now + timedelta(days=1, hours=i + 1)
+        )
+        for i in range(size)
+    ])
+    db.add_all([
+        EventOrganiser(event_id=event.event_id, user_id=user.user_id, role=OrganiserRole.staff)
+        for user in users
+    ])
+    db.add_all([
+        EventRegistration(
+            event_id=event.event_id, name=f"Attendee {i}", email="attendee@example.com",
+            phone="0", qr_code=str(uuid4())
+        )
+        for i in range(size)
+    ])
+    db.commit()
+    return event.event_id
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "events.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        event_ids = {size: seed_event(db, size) for size in (1, 5)}
+    sync_engine.dispose()
+    return f"sqlite+aiosqlite:///{path}", event_ids
+
+
+def count_queries(url: str, fetch) -> tuple[int, object]:
+    """Runs `fetch(db)` on a fresh AsyncSession and counts the statements it sends."""
+    async def run():
+        engine = create_async_engine(url)
+        statements = []
+        event.listen(
+            engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement)
+        )
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                result = await fetch(db)
+        finally:
+            await engine.dispose()
+        return len(statements), result
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("size", [1, 5])
+def test_get_detail_query_count(database, size):
+    url, event_ids = database
+    queries, detail = count_queries(url, lambda db: AsyncEventRepository.get_detail(db, event_ids[size]))
+
+    assert queries == DETAIL_QUERIES
+    assert len(detail.sessions) == size
+    assert len(detail.organisers) == size
+    assert detail.category is not None
+
+
+@pytest.mark.parametrize("size", [1, 5])
+def test_event_detail_with_registration_count_query_count(database, size):
+    url, event_ids = database
+    queries, detail = count_queries(url, lambda db: EventService.get_event_detail_async(db, event_ids[size]))
+
+    assert queries == DETAIL_WITH_COUNT_QUERIES
+    assert detail.registration_count == size